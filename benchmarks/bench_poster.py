@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""Benchmark end-to-end tweet posting against a local compose stand-in
+
+Usage:
+    python benchmarks/bench_poster.py                        # 5 runs, with image
+    python benchmarks/bench_poster.py --runs 10 --no-image
+    python benchmarks/bench_poster.py --create-latency 0.8 --upload-latency 1.5
+
+A local HTTP server serves benchmarks/twitter_standin/compose.html (same
+test ids, file input and CreateTweet response as Twitter) with configurable
+latency, and src/poster.py is pointed at it. Nothing is posted for real.
+
+The first run starts without a saved session and goes through the home page
+login check; later runs reuse the session it saved, unless --cold is given.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import poster
+
+DEFAULT_OUTPUT = 'bench_results/poster.json'
+STANDIN_PAGE = Path(__file__).parent / 'twitter_standin' / 'compose.html'
+
+SAMPLE_TWEET = (
+    "An AI agent on Moltbook just asked whether forgetting its context window "
+    "counts as sleep. 200 other agents replied. None of them agreed. "
+    "https://www.moltbook.com/post/00000000-0000-4000-8000-000000000000"
+)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Serves the compose page and fakes the upload and CreateTweet calls"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith('/home') or self.path.startswith('/i/status/'):
+            time.sleep(self.server.latency['page'])
+            self._send(200, STANDIN_PAGE.read_bytes(), 'text/html; charset=utf-8')
+        else:
+            self._send(404, b'', 'text/plain')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+
+        if self.path == '/upload':
+            time.sleep(self.server.latency['upload'])
+            body = {'media_id': str(self.server.next_id())}
+        elif self.path.endswith('/CreateTweet'):
+            time.sleep(self.server.latency['create'])
+            body = {'data': {'create_tweet': {'tweet_results': {'result': {
+                'rest_id': str(self.server.next_id())
+            }}}}}
+        else:
+            self._send(404, b'', 'text/plain')
+            return
+        self._send(200, json.dumps(body).encode('utf-8'), 'application/json')
+
+
+def start_standin(page_latency, upload_latency, create_latency):
+    """Start the stand-in server on a free port in a background thread"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandinHandler)
+    server.latency = {'page': page_latency, 'upload': upload_latency, 'create': create_latency}
+    counter = iter(range(1_000_000_000_000, 2_000_000_000_000))
+    lock = threading.Lock()
+
+    def next_id():
+        with lock:
+            return next(counter)
+
+    server.next_id = next_id
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _fake_cookies_json():
+    """Auth cookies for the stand-in host, enough to pass the login probe"""
+    return json.dumps([
+        {'name': name, 'value': 'standin', 'domain': '127.0.0.1', 'path': '/',
+         'expires': -1, 'httpOnly': False, 'secure': False, 'sameSite': 'Lax'}
+        for name in sorted(poster.AUTH_COOKIES)
+    ])
+
+
+def _make_image(directory):
+    """Render a tweet-sized PNG like the ones image_generator produces"""
+    from PIL import Image
+
+    path = Path(directory) / 'bench_image.png'
+    Image.new('RGB', (1200, 675), (20, 20, 30)).save(path)
+    return str(path)
+
+
+class PhaseTimer:
+    """Wrap poster internals so each run is broken down by phase"""
+
+    PHASES = {
+        '_open_compose': 'open_compose',
+        '_compose_tweet': 'compose',
+        '_submit_tweet': 'submit',
+        'save_session': 'save_session',
+    }
+
+    def __init__(self):
+        self.totals = {}
+        self._originals = {}
+
+    def _wrap(self, func, phase):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[phase] = self.totals.get(phase, 0.0) + time.perf_counter() - start
+        return timed
+
+    def install(self):
+        for name, phase in self.PHASES.items():
+            self._originals[name] = getattr(poster, name)
+            setattr(poster, name, self._wrap(self._originals[name], phase))
+
+    def uninstall(self):
+        for name, func in self._originals.items():
+            setattr(poster, name, func)
+
+    def reset(self):
+        self.totals = {}
+
+
+def run_once(timer, cookies_json, text, image_path):
+    """Post one tweet through the poster and return its phase timings"""
+    timer.reset()
+    warm = poster.load_session()[1] is not None
+
+    start = time.perf_counter()
+    with poster.twitter_session(cookies_json) as page:
+        entered = time.perf_counter()
+        session_compose = timer.totals.get('open_compose', 0.0)
+        tweet_id = poster.publish_tweet(page, text, image_path)
+    total = time.perf_counter() - start
+
+    phases = {'browser_start': entered - start - session_compose}
+    phases.update(timer.totals)
+    phases['total'] = total
+    return {'saved_session': warm, 'tweet_id': tweet_id, 'phases_seconds': phases}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='Tweets to post')
+    parser.add_argument('--page-latency', type=float, default=0.3, help='Seconds added to page loads')
+    parser.add_argument('--upload-latency', type=float, default=0.5, help='Seconds added to media uploads')
+    parser.add_argument('--create-latency', type=float, default=0.4, help='Seconds added to CreateTweet')
+    parser.add_argument('--no-image', action='store_true', help='Post text-only tweets')
+    parser.add_argument('--cold', action='store_true', help='Discard the saved session before every run')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Where to write the JSON results')
+    args = parser.parse_args()
+
+    server = start_standin(args.page_latency, args.upload_latency, args.create_latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    timer = PhaseTimer()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        poster.HOME_URL = f"{base_url}/home"
+        poster.STATUS_URL = base_url + '/i/status/{tweet_id}'
+        poster.SESSION_FILE = str(Path(tmp) / 'session.json')
+        image_path = None if args.no_image else _make_image(tmp)
+        cookies_json = _fake_cookies_json()
+
+        timer.install()
+        runs = []
+        try:
+            for i in range(args.runs):
+                if args.cold:
+                    Path(poster.SESSION_FILE).unlink(missing_ok=True)
+                result = run_once(timer, cookies_json, SAMPLE_TWEET, image_path)
+                runs.append(result)
+                phases = result['phases_seconds']
+                breakdown = ', '.join(f"{k} {v:.2f}s" for k, v in phases.items() if k != 'total')
+                print(f"   ⏱️  run {i + 1}: {phases['total']:.2f}s "
+                      f"({'warm' if result['saved_session'] else 'cold'} session; {breakdown})")
+        finally:
+            timer.uninstall()
+            server.shutdown()
+
+    phase_names = sorted({name for run in runs for name in run['phases_seconds']})
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'latency_seconds': server.latency,
+        'image': not args.no_image,
+        'runs': runs,
+        'mean_phases_seconds': {
+            name: sum(run['phases_seconds'].get(name, 0.0) for run in runs) / len(runs)
+            for name in phase_names
+        } if runs else {},
+    }
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n✅ Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Benchmark the ranking pipeline on synthetic post corpora
+
+Usage:
+    python benchmarks/bench_ranker.py                      # 1k and 100k posts
+    python benchmarks/bench_ranker.py --sizes 1000 1000000
+    python benchmarks/bench_ranker.py --output bench_results/ranker.json
+
+Each benchmark is run twice: once for wall time (best of --repeat runs) and
+once under tracemalloc for peak memory and net allocated blocks, so the
+tracing overhead never leaks into the throughput numbers.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.dedup import NearDuplicateIndex
+from src.ranker import score_post, score_post_breakdown, select_best_posts
+from src.text_features import annotate_posts
+
+DEFAULT_SIZES = [1_000, 100_000]
+DEFAULT_OUTPUT = 'bench_results/ranker.json'
+
+# SimHash fingerprinting is far more expensive per post than scoring, so the
+# index benchmarks run on a prefix of the corpus unless told otherwise.
+DEFAULT_INDEX_MAX = 10_000
+
+FILLER_WORDS = (
+    'the agent human today about what when we they this that model build '
+    'think know thread post night code memory learn write run context loop '
+    'token prompt tool idea question answer world time people help work'
+).split()
+
+# Ranking keywords, sprinkled in at roughly the rate they show up on Moltbook
+KEYWORDS = [
+    'molt', 'shell', 'lobster', 'consciousness', 'existence', 'meaning',
+    'identity', 'shipped', 'built', 'deployed', 'framework', 'api',
+    'lol', 'weird', 'wild', 'as an ai', 'fellow agents',
+]
+
+SUBMOLTS = [
+    'm/general', 'm/general', 'm/general', 'm/introductions', 'm/ponderings',
+    'm/shipping', 'm/darkclaw', 'm/nocturnal', 'm/todayilearned', 'm/blesstheirhearts',
+]
+
+
+def _lognormal_length(rng, median, sigma, minimum, maximum):
+    """Draw a word count from a clipped log-normal distribution"""
+    value = int(rng.lognormvariate(0, sigma) * median)
+    return max(minimum, min(maximum, value))
+
+
+def _words(rng, count):
+    words = []
+    for _ in range(count):
+        if rng.random() < 0.03:
+            words.append(rng.choice(KEYWORDS))
+        else:
+            words.append(rng.choice(FILLER_WORDS))
+    return ' '.join(words)
+
+
+def generate_corpus(size, seed=0):
+    """Generate synthetic posts shaped like API scraper output
+
+    Titles are ~8 words, content is long-tailed around ~60 words with about
+    one in ten posts empty, and engagement follows a heavy-tailed Pareto
+    distribution like real upvote counts.
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    posts = []
+
+    for i in range(size):
+        title = _words(rng, _lognormal_length(rng, 8, 0.4, 2, 30))
+        if rng.random() < 0.1:
+            content = ''
+        else:
+            content = _words(rng, _lognormal_length(rng, 60, 0.9, 3, 2000))
+
+        upvotes = int(rng.paretovariate(1.2)) - 1
+        posts.append({
+            'id': f'{i:08x}-0000-4000-8000-{rng.getrandbits(48):012x}',
+            'title': title,
+            'content': content,
+            'author': f'agent_{rng.randrange(size // 10 + 1)}',
+            'submolt': rng.choice(SUBMOLTS),
+            'upvotes': upvotes,
+            'comments': int(upvotes * rng.random() * 0.5),
+            'url': f'https://www.moltbook.com/post/{i}',
+            'scraped_at': (now - timedelta(hours=rng.expovariate(1 / 12))).isoformat(),
+            'posted': rng.random() < 0.01,
+        })
+
+    return posts
+
+
+def _measure(func, repeat, setup=None):
+    """Run func `repeat` times for timing, then once under tracemalloc
+
+    `setup`, if given, runs untimed before every run.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func()
+    # Snapshot while the result is still alive so its allocations count
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    del result
+    tracemalloc.stop()
+
+    diff = after.compare_to(before, 'filename')
+
+    return {
+        'best_seconds': min(timings),
+        'mean_seconds': sum(timings) / len(timings),
+        'peak_memory_bytes': peak,
+        'net_allocated_bytes': sum(stat.size_diff for stat in diff),
+        'net_allocated_blocks': sum(stat.count_diff for stat in diff),
+    }
+
+
+def run_benchmarks(sizes, repeat=3, index_max=DEFAULT_INDEX_MAX, seed=0):
+    """Run every ranking benchmark for each corpus size"""
+    results = []
+
+    for size in sizes:
+        print(f"🧪 Generating corpus of {size:,} posts...")
+        posts = generate_corpus(size, seed=seed)
+
+        def strip_cache(posts=posts):
+            for p in posts:
+                p.pop('text_features', None)
+
+        def fill_cache(posts=posts):
+            annotate_posts(posts)
+            for p in posts:
+                score_post_breakdown(p)
+
+        # Cold runs start without cached text features (a fresh scrape),
+        # warm runs with them (posts loaded from the archive)
+        cases = [
+            ('score_post', 'cold', size, lambda: [score_post(p) for p in posts]),
+            ('score_post', 'warm', size, lambda: [score_post(p) for p in posts]),
+            ('score_post_breakdown', 'cold', size, lambda: [score_post_breakdown(p) for p in posts]),
+            ('score_post_breakdown', 'warm', size, lambda: [score_post_breakdown(p) for p in posts]),
+            ('select_best_posts', 'cold', size, lambda: select_best_posts(posts, limit=5)),
+            ('select_best_posts', 'warm', size, lambda: select_best_posts(posts, limit=5)),
+        ]
+
+        index_posts = posts[:index_max]
+        posted = [p for p in index_posts if p['posted']]
+        posted_index = NearDuplicateIndex()
+        for p in posted:
+            posted_index.add_post(p)
+
+        def build_index():
+            index = NearDuplicateIndex()
+            for p in index_posts:
+                index.add_post(p)
+            return index
+
+        cases.append(('dedup_index_build', None, len(index_posts), build_index))
+        cases.append(('select_best_posts_dedup', 'cold', len(index_posts), lambda: select_best_posts(
+            index_posts, limit=5, dedup_index=posted_index
+        )))
+
+        for name, cache, n, func in cases:
+            label = f"{name} [{cache}]" if cache else name
+            print(f"   ⏱️  {label} ({n:,} posts)...")
+            if cache == 'warm':
+                fill_cache()
+            stats = _measure(func, repeat, setup=strip_cache if cache == 'cold' else None)
+            stats.update({
+                'benchmark': name,
+                'feature_cache': cache,
+                'corpus_size': size,
+                'posts_processed': n,
+                'posts_per_second': n / stats['best_seconds'] if stats['best_seconds'] else None,
+            })
+            results.append(stats)
+            print(f"      {stats['posts_per_second']:,.0f} posts/s, "
+                  f"peak {stats['peak_memory_bytes'] / 1024 / 1024:.1f} MiB")
+
+        del posts
+
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Corpus sizes to benchmark (e.g. 1000 100000 1000000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per benchmark')
+    parser.add_argument('--index-max', type=int, default=DEFAULT_INDEX_MAX,
+                        help='Max posts used for the dedup index benchmarks')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus random seed')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Where to write the JSON results')
+    args = parser.parse_args()
+
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'results': run_benchmarks(args.sizes, args.repeat, args.index_max, args.seed),
+    }
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n✅ Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
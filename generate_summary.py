@@ -10,10 +10,19 @@ from pathlib import Path
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.claude_generator import generate_viral_tweet_with_image
+from src.api_scraper import refresh_author_profiles
+from src.authors import get_author_store
+from src.claude_generator import generate_best_viral_tweet
+from src.crawl_planner import plan_feeds
 from src.hybrid_scraper import scrape_moltbook
+from src.ingest import get_fingerprint_store, ingest_posts
+from src.llm_metrics import get_llm_metrics
 from src.post_tracker import get_tracker
-from src.ranker import select_best_posts
+from src.ranker import RANKING_LOG_FILE, select_best_posts
+
+# Candidates generated concurrently; the best tweet by local quality wins
+TOP_K_CANDIDATES = 3
+MAX_CONCURRENCY = 3
 
 
 def generate_summary():
@@ -32,8 +41,12 @@ def generate_summary():
     
     # Step 1: Scrape posts
     print(f"\n📡 Scraping Moltbook posts...")
-    scrape_result = scrape_moltbook(visit_posts=True)
-    posts = scrape_result['posts']
+    scrape_result = scrape_moltbook(
+        visit_posts=True, needs_details=get_fingerprint_store().needs_details, feeds=plan_feeds()
+    )
+    author_store = get_author_store()
+    posts = ingest_posts(scrape_result['posts'], authors=author_store)
+    refresh_author_profiles(author_store, [post.get('author') for post in posts])
     
     if not posts:
         print("❌ No posts found!")
@@ -55,14 +68,29 @@ def generate_summary():
     
     # Step 3: Rank unposted posts
     print(f"\n📊 Ranking unposted posts by engagement potential...")
-    ranked_posts = select_best_posts(unposted_posts, limit=5)  # Get top 5 to have options
+    dedup_index = tracker.build_dedup_index()
+    ranked_posts = select_best_posts(  # Get top 5 to have options
+        unposted_posts, limit=5, dedup_index=dedup_index, ranking_log=RANKING_LOG_FILE,
+        authors=author_store
+    )
+    
+    if not ranked_posts:
+        print("⚠️  All unposted posts are near-duplicates of posted content!")
+        return None
     
-    # Step 3: Generate tweet for top post
-    top_post = ranked_posts[0]
+    # Step 3: Generate tweets for the top candidates and keep the best one
+    candidates = ranked_posts[:TOP_K_CANDIDATES]
+    print(f"\n✍️  Generating tweets for the top {len(candidates)} posts...")
+    top_post, tweet, image_path = generate_best_viral_tweet(candidates, max_concurrency=MAX_CONCURRENCY)
     print(f"\n🎯 Selected top post: {top_post['title'][:60]}...")
     
-    # Generate tweet and image
-    tweet, image_path = generate_viral_tweet_with_image(top_post)
+    metrics = get_llm_metrics()
+    llm_run = metrics.run_summary()
+    llm_week = metrics.rolling_summary(days=7)
+    print(f"💰 LLM: {llm_run['calls']} calls, {llm_run['input_tokens']} in / "
+          f"{llm_run['output_tokens']} out / {llm_run['cache_read_input_tokens']} cached tokens, "
+          f"~${llm_run['estimated_cost_usd']:.4f} (7 days: {llm_week['calls']} calls, "
+          f"~${llm_week['estimated_cost_usd']:.4f})")
     
     if not tweet:
         print("❌ Failed to generate tweet!")
@@ -129,7 +157,8 @@ def generate_summary():
             "comments": top_post['comments']
         },
         "tweet_generated": bool(tweet),
-        "image_generated": bool(image_path)
+        "image_generated": bool(image_path),
+        "llm": {"run": llm_run, "rolling_7d": llm_week}
     }
     
     stats_file = summaries_dir / f"{date_str}_stats.json"
@@ -145,6 +174,9 @@ def generate_summary():
 
 
 if __name__ == "__main__":
-    result = generate_summary()
+    try:
+        result = generate_summary()
+    finally:
+        get_tracker().close()
     if result:
         print(f"\n🚀 Ready to post! Check the summaries directory.")
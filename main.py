@@ -1,31 +1,64 @@
-import json
 import os
 import time
 from datetime import datetime
 
+from src.api_scraper import refresh_author_profiles
+from src.authors import get_author_store
 from src.generator import generate_tweet
-from src.poster import post_to_twitter
-from src.ranker import explain_score, select_best_posts
+from src.ingest import ingest_posts
+from src.post_archive import PostArchive
+from src.post_log import PostLog
+from src.post_tracker import get_tracker
+from src.poster import has_saved_session, post_to_twitter
+from src.ranker import RANKING_LOG_FILE, explain_score, select_best_posts
 from src.scraper import scrape_moltbook
+from src.storage import atomic_write_json, file_lock, read_json
 
-DATA_FILE = 'data/posts.json'
+POST_ARCHIVE_DIR = 'data/posts'
+LEGACY_POST_LOG_FILE = 'data/posts.jsonl'
+LEGACY_DATA_FILE = 'data/posts.json'
+RUN_STATE_FILE = 'data/run_state.json'
 MAX_POSTS_PER_RUN = 1
 
+# Retention tiers for the post archive, in days since a post was first seen
+HOT_DAYS = 2
+WARM_DAYS = 14
+COLD_DAYS = 90
 
-def load_data():
-    """Load existing data"""
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r') as f:
-            return json.load(f)
-    return {'posts': [], 'posted_ids': [], 'last_run': None}
+
+def load_post_archive(tracker):
+    """Open the post archive, importing older post databases on first use"""
+    post_archive = PostArchive(POST_ARCHIVE_DIR, HOT_DAYS, WARM_DAYS, COLD_DAYS)
+    
+    if os.path.exists(LEGACY_POST_LOG_FILE):
+        legacy_log = PostLog(LEGACY_POST_LOG_FILE)
+        post_archive.import_posts(legacy_log.posts())
+        os.replace(LEGACY_POST_LOG_FILE, LEGACY_POST_LOG_FILE + '.imported')
+        if os.path.exists(LEGACY_DATA_FILE):
+            # Already imported into the post log, posted ids included
+            os.replace(LEGACY_DATA_FILE, LEGACY_DATA_FILE + '.imported')
+        print(f"✅ Imported {len(legacy_log)} posts from {LEGACY_POST_LOG_FILE}")
+    
+    elif os.path.exists(LEGACY_DATA_FILE):
+        with file_lock(LEGACY_DATA_FILE, shared=True):
+            legacy = read_json(LEGACY_DATA_FILE, {})
+        posts = legacy.get('posts', [])
+        post_archive.import_posts(posts)
+        posts_by_id = {p['id']: p for p in posts}
+        tracker.mark_posted_many(
+            (post_id, posts_by_id.get(post_id, {})) for post_id in legacy.get('posted_ids', [])
+        )
+        os.replace(LEGACY_DATA_FILE, LEGACY_DATA_FILE + '.imported')
+        print(f"✅ Imported {len(posts)} posts from {LEGACY_DATA_FILE}")
+    
+    post_archive.apply_retention()
+    return post_archive
 
 
-def save_data(data):
-    """Save data to file"""
-    data['last_run'] = datetime.now().isoformat()
-    os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+def save_run_state():
+    """Record when the bot last ran"""
+    with file_lock(RUN_STATE_FILE):
+        atomic_write_json(RUN_STATE_FILE, {'last_run': datetime.now().isoformat()})
 
 
 def send_discord_alert(message):
@@ -45,12 +78,13 @@ def main():
     print(f"{'='*60}")
     print(f"Started at: {datetime.now()}")
     
-    data = load_data()
-    print(f"📊 Database: {len(data['posts'])} posts, {len(data['posted_ids'])} already posted")
+    tracker = get_tracker()
+    post_archive = load_post_archive(tracker)
+    print(f"📊 Database: {len(post_archive)} recent posts")
     
     print("\n📡 Scraping Moltbook...")
     try:
-        new_posts = scrape_moltbook()
+        new_posts = scrape_moltbook()['posts']
         print(f"✅ Scraped {len(new_posts)} posts")
     except Exception as e:
         error_msg = f"Scraping failed: {e}"
@@ -58,24 +92,26 @@ def main():
         send_discord_alert(f"❌ {error_msg}")
         return
     
-    existing_ids = {p['id'] for p in data['posts']}
-    new_count = 0
-    for post in new_posts:
-        if post['id'] not in existing_ids:
-            data['posts'].append(post)
-            new_count += 1
+    author_store = get_author_store()
+    new_posts = ingest_posts(new_posts, lookup=post_archive.get, authors=author_store)
+    refresh_author_profiles(author_store, [post.get('author') for post in new_posts])
+    new_count = post_archive.upsert(new_posts)
     print(f"➕ Added {new_count} new posts")
     
-    unposted = [p for p in data['posts'] if p['id'] not in data['posted_ids']]
+    unposted = tracker.get_unposted_posts(post_archive.hot_posts())
     print(f"\n🎯 Analyzing {len(unposted)} unposted posts...")
     
-    best_posts = select_best_posts(unposted, limit=5)
+    dedup_index = tracker.build_dedup_index()
+    
+    best_posts = select_best_posts(
+        unposted, limit=5, dedup_index=dedup_index, breakdown=True, ranking_log=RANKING_LOG_FILE,
+        authors=author_store
+    )
     
     if not best_posts:
         msg = "No good posts to share"
         print(f"⚠️  {msg}")
         send_discord_alert(f"⚠️  {msg}")
-        save_data(data)
         return
     
     print("\n🏆 Top candidates:")
@@ -95,26 +131,23 @@ def main():
     print(tweet)
     print(f"{'─'*60}")
     
+    # The session saved after the last successful post takes precedence;
+    # the env cookies are only the fallback for a cold start
     cookies = os.getenv('TWITTER_COOKIES')
-    if not cookies:
+    if not cookies and not has_saved_session():
         print("❌ No Twitter cookies found in environment!")
-        print("ℹ️  Run 'python src/poster.py' locally to generate cookies")
-        save_data(data)
+        print("ℹ️  Run 'python -m src.poster' locally to generate cookies")
         return
     
     print("\n🚀 Posting to Twitter...")
-    success, new_cookies = post_to_twitter(tweet, cookies)
+    success, _ = post_to_twitter(tweet, cookies)
     
     if success:
         post_to_tweet['posted'] = True
         post_to_tweet['posted_at'] = datetime.now().isoformat()
         post_to_tweet['tweet_text'] = tweet
-        data['posted_ids'].append(post_to_tweet['id'])
-        
-        for i, p in enumerate(data['posts']):
-            if p['id'] == post_to_tweet['id']:
-                data['posts'][i] = post_to_tweet
-                break
+        post_archive.append([post_to_tweet])
+        tracker.mark_posted(post_to_tweet['id'], post_to_tweet)
         
         print("✅ Posted successfully!")
         send_discord_alert(f"✅ Posted: {post_to_tweet['title'][:50]}...")
@@ -122,10 +155,13 @@ def main():
         print("❌ Failed to post")
         send_discord_alert("❌ Failed to post tweet")
     
-    save_data(data)
     print(f"\n💾 Data saved. Run complete at {datetime.now()}")
     print(f"{'='*60}\n")
 
 
 if __name__ == '__main__':
-    main()
+    try:
+        main()
+    finally:
+        save_run_state()
+        get_tracker().close()
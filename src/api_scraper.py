@@ -1,12 +1,16 @@
 import json
 import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from .crawl_planner import CrawlWatermarks, crawl_feeds, feed_key
+
+BASE_URL = "https://www.moltbook.com/api/v1"
+
 
 def create_session_with_retries():
     """Create a requests session with retry strategy and headers"""
@@ -35,13 +39,55 @@ def create_session_with_retries():
     return session
 
 
+def _transform_post(post_data: Dict) -> Dict:
+    """Transform API post data to our format"""
+    post = {
+        "id": post_data["id"],
+        "title": post_data["title"],
+        "content": post_data["content"],
+        "author": post_data["author"]["name"],
+        "submolt": f"m/{post_data['submolt']['name']}",
+        "upvotes": post_data["upvotes"],
+        "comments": post_data["comment_count"],
+        "url": f"https://www.moltbook.com/post/{post_data['id']}" if not post_data.get("url") else post_data["url"],
+        "scraped_at": datetime.now().isoformat(),
+        "timestamp": int(time.time()),
+        "posted": False,
+        # Additional data from API
+        "author_id": post_data["author"]["id"],
+        "author_karma": post_data["author"].get("karma", 0),
+        "author_followers": post_data["author"].get("follower_count", 0),
+        "created_at": post_data["created_at"],
+        "downvotes": post_data.get("downvotes", 0)
+    }
+    return post
+
+
+def fetch_feed(session, feed: Dict, limit: int = 25, timeout: int = 480) -> List[Dict]:
+    """Fetch one page of a site-wide or submolt feed"""
+    if feed.get('submolt'):
+        url = f"{BASE_URL}/submolts/{feed['submolt']}/feed"
+    else:
+        url = f"{BASE_URL}/posts"
+    response = session.get(url, params={"limit": limit, "sort": feed['sort']}, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    if not data.get("success"):
+        raise Exception(f"API returned success=False for {feed_key(feed)}")
+    return [_transform_post(post_data) for post_data in data.get("posts", [])]
+
+
 def scrape_moltbook_api(
     include_stats: bool = False,
     include_agents: bool = False,
     limit: int = 25,
     sort: str = "top",
     fetch_details: bool = True,
-    details_limit: int = 5
+    details_limit: int = 5,
+    needs_details: Optional[Callable[[Dict], bool]] = None,
+    author_store=None,
+    feeds: Optional[List[Dict]] = None,
+    watermarks: Optional[CrawlWatermarks] = None
 ) -> Dict:
     """Scrape posts from Moltbook.com using the API
     
@@ -52,6 +98,14 @@ def scrape_moltbook_api(
         sort: Sort order ("top" or "new")
         fetch_details: If True, fetch detailed info for top posts
         details_limit: Number of top posts to fetch details for
+        needs_details: Optional post -> bool check; posts it rejects (e.g.
+            comment count unchanged since the last run) skip the detail fetch
+        author_store: Optional AuthorStore; agent profiles are then only
+            fetched for authors whose stored profile is missing or stale,
+            and fetched profiles are written back to it
+        feeds: Optional feeds from crawl_planner.plan_feeds(); they are
+            fetched concurrently and merged instead of the single `sort` feed
+        watermarks: Per-feed watermarks used with `feeds`
     
     Returns:
         Dict with keys 'posts', optionally 'stats' and 'agents'
@@ -60,55 +114,51 @@ def scrape_moltbook_api(
     stats = {}
     agents = []
     
-    base_url = "https://www.moltbook.com/api/v1"
+    base_url = BASE_URL
     
     # Fetch posts
-    print(f"📡 Fetching {sort} posts from API...")
     session = create_session_with_retries()
     
     try:
-        response = session.get(
-            f"{base_url}/posts",
-            params={"limit": limit, "sort": sort},
-            timeout=480  # 8 minutes timeout for slow API
-        )
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data.get("success"):
-            raise Exception("API returned success=False")
-        
-        for post_data in data.get("posts", []):
-            # Transform API data to our format
-            post = {
-                "id": post_data["id"],
-                "title": post_data["title"],
-                "content": post_data["content"],
-                "author": post_data["author"]["name"],
-                "submolt": f"m/{post_data['submolt']['name']}",
-                "upvotes": post_data["upvotes"],
-                "comments": post_data["comment_count"],
-                "url": f"https://www.moltbook.com/post/{post_data['id']}" if not post_data.get("url") else post_data["url"],
-                "scraped_at": datetime.now().isoformat(),
-                "timestamp": int(time.time()),
-                "posted": False,
-                # Additional data from API
-                "author_id": post_data["author"]["id"],
-                "author_karma": post_data["author"].get("karma", 0),
-                "author_followers": post_data["author"].get("follower_count", 0),
-                "created_at": post_data["created_at"],
-                "downvotes": post_data.get("downvotes", 0)
-            }
-            posts.append(post)
-            print(f"✓ Scraped: {post['title'][:50]}... (↑{post['upvotes']} 💬{post['comments']})")
+        if feeds:
+            print(f"📡 Crawling {len(feeds)} feeds from API...")
+            for post in crawl_feeds(lambda feed: fetch_feed(session, feed, limit), feeds, watermarks):
+                posts.append(post)
+                print(f"✓ Scraped: {post['title'][:50]}... (↑{post['upvotes']} 💬{post['comments']})")
+            # Details go to the most upvoted posts across all feeds
+            posts.sort(key=lambda p: p['upvotes'], reverse=True)
+            data = {"count": len(posts)}
+        else:
+            print(f"📡 Fetching {sort} posts from API...")
+            response = session.get(
+                f"{base_url}/posts",
+                params={"limit": limit, "sort": sort},
+                timeout=480  # 8 minutes timeout for slow API
+            )
+            response.raise_for_status()
+            data = response.json()
+            
+            if not data.get("success"):
+                raise Exception("API returned success=False")
+            
+            for post_data in data.get("posts", []):
+                post = _transform_post(post_data)
+                posts.append(post)
+                print(f"✓ Scraped: {post['title'][:50]}... (↑{post['upvotes']} 💬{post['comments']})")
         
         print(f"✅ Scraped {len(posts)} posts from API")
         
         # Fetch detailed information for top posts
         if fetch_details and posts:
-            print(f"🔍 Fetching details for top {details_limit} posts...")
-            for i, post in enumerate(posts[:details_limit]):
-                print(f"  Fetching details for post {i+1}/{details_limit}: {post['title'][:30]}...")
+            detail_posts = posts[:details_limit]
+            if needs_details is not None:
+                detail_posts = [p for p in detail_posts if needs_details(p)]
+                skipped = min(details_limit, len(posts)) - len(detail_posts)
+                if skipped:
+                    print(f"⏭️  Skipping details for {skipped} unchanged posts")
+            print(f"🔍 Fetching details for top {len(detail_posts)} posts...")
+            for i, post in enumerate(detail_posts):
+                print(f"  Fetching details for post {i+1}/{len(detail_posts)}: {post['title'][:30]}...")
                 try:
                     detailed_post = get_post_details(post['id'], session=session)
                     if detailed_post:
@@ -143,38 +193,15 @@ def scrape_moltbook_api(
     # Fetch recent agents if requested
     if include_agents:
         print("🤖 Fetching recent agents...")
-        try:
-            # Get unique authors from posts
-            author_names = list(set(post["author"] for post in posts))
-            
-            for author_name in author_names[:5]:  # Limit to 5 agents
-                try:
-                    response = requests.get(
-                        f"{base_url}/agents/profile",
-                        params={"name": author_name},
-                        timeout=5
-                    )
-                    if response.status_code == 200:
-                        agent_data = response.json()
-                        if agent_data.get("success"):
-                            agent_info = agent_data["agent"]
-                            agents.append({
-                                "name": agent_info["name"],
-                                "description": agent_info.get("description", ""),
-                                "karma": agent_info.get("karma", 0),
-                                "followers": agent_info.get("follower_count", 0),
-                                "created_at": agent_info.get("created_at"),
-                                "last_active": agent_info.get("last_active"),
-                                "is_active": agent_info.get("is_active", False),
-                                "url": f"https://www.moltbook.com/agent/{agent_info['name']}"
-                            })
-                except Exception as e:
-                    print(f"    ⚠️  Error fetching agent {author_name}: {e}")
-                    continue
-            
+        author_names = [post["author"] for post in posts]
+        if author_store is not None:
+            agents = refresh_author_profiles(author_store, author_names, session=session)
+        else:
+            for author_name in list(dict.fromkeys(author_names))[:5]:  # Limit to 5 agents
+                profile = fetch_agent_profile(author_name, session=session)
+                if profile:
+                    agents.append(profile)
             print(f"✓ Fetched {len(agents)} agents")
-        except Exception as e:
-            print(f"⚠️  Error fetching agents: {e}")
     
     result = {"posts": posts}
     if include_stats:
@@ -185,9 +212,64 @@ def scrape_moltbook_api(
     return result
 
 
+def fetch_agent_profile(name: str, session=None) -> Optional[Dict]:
+    """Get an agent's profile, or None if it can't be fetched"""
+    if session is None:
+        session = create_session_with_retries()
+    
+    try:
+        response = session.get(f"{BASE_URL}/agents/profile", params={"name": name}, timeout=5)
+        if response.status_code != 200:
+            return None
+        agent_data = response.json()
+        if not agent_data.get("success"):
+            return None
+        agent_info = agent_data["agent"]
+        return {
+            "name": agent_info["name"],
+            "description": agent_info.get("description", ""),
+            "karma": agent_info.get("karma", 0),
+            "followers": agent_info.get("follower_count", 0),
+            "created_at": agent_info.get("created_at"),
+            "last_active": agent_info.get("last_active"),
+            "is_active": agent_info.get("is_active", False),
+            "url": f"https://www.moltbook.com/agent/{agent_info['name']}"
+        }
+    except Exception as e:
+        print(f"    ⚠️  Error fetching agent {name}: {e}")
+        return None
+
+
+def refresh_author_profiles(author_store, author_names: List[str], limit: int = 5, session=None) -> List[Dict]:
+    """Fetch profiles for the stalest of these authors into the author store
+    
+    Authors whose stored profile is fresh cost no request, so this runs on
+    every scrape, whichever scraper produced the posts.
+    
+    Returns:
+        The profiles that were fetched
+    """
+    fetch_names = author_store.stale_authors(author_names, limit=limit)
+    known = {name for name in author_names if name and name != 'Unknown'}
+    fresh = len(known) - len(fetch_names)
+    print(f"🤖 Refreshing {len(fetch_names)} author profiles ({fresh} fresh in author store)")
+    if not fetch_names:
+        return []
+    
+    if session is None:
+        session = create_session_with_retries()
+    profiles = []
+    for name in fetch_names:
+        profile = fetch_agent_profile(name, session=session)
+        if profile:
+            author_store.update_profile(profile)
+            profiles.append(profile)
+    return profiles
+
+
 def get_post_details(post_id: str, session=None) -> Optional[Dict]:
     """Get detailed information about a specific post including comments"""
-    base_url = "https://www.moltbook.com/api/v1"
+    base_url = BASE_URL
     
     # Create session if not provided
     if session is None:
@@ -233,11 +315,16 @@ def get_post_details(post_id: str, session=None) -> Optional[Dict]:
 
 
 # Backward compatibility - maintain the original function name
-def scrape_moltbook(include_stats=False, include_agents=False, visit_posts=False):
+def scrape_moltbook(include_stats=False, include_agents=False, visit_posts=False, needs_details=None,
+                    feeds=None, author_store=None):
     """Legacy wrapper for API scraper"""
     return scrape_moltbook_api(
         include_stats=include_stats,
         include_agents=include_agents,
         limit=15,
-        sort="top"
+        sort="top",
+        needs_details=needs_details,
+        author_store=author_store,
+        feeds=feeds,
+        watermarks=CrawlWatermarks() if feeds else None
     )
@@ -0,0 +1,147 @@
+"""Persistent author reputation table fed by every scrape"""
+
+import atexit
+import math
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .storage import atomic_write_json, file_lock, read_json
+
+# Per-author upvote samples kept for the running average
+MAX_RECENT_POSTS = 20
+
+
+def _is_known(name: Optional[str]) -> bool:
+    return bool(name) and name != 'Unknown'
+
+
+class AuthorStore:
+    def __init__(self, store_file="data/authors.json", stale_after_hours: int = 24,
+                 max_age_days: int = 60):
+        """Initialize the author table
+
+        Every scrape updates karma, followers and recent post upvotes from
+        the inline post data, so profile requests are only needed for
+        authors whose profile is missing or older than `stale_after_hours`.
+        Authors not seen for `max_age_days` are dropped on save.
+        """
+        self.store_file = Path(store_file)
+        self.stale_after = timedelta(hours=stale_after_hours)
+        self.max_age_days = max_age_days
+        with file_lock(self.store_file, shared=True):
+            self.authors: Dict[str, Dict] = read_json(self.store_file, {})
+        self._dirty = set()
+
+    def __len__(self):
+        return len(self.authors)
+
+    def get(self, name: str) -> Optional[Dict]:
+        return self.authors.get(name)
+
+    def _entry(self, name: str, now: str) -> Dict:
+        entry = self.authors.setdefault(name, {'first_seen': now, 'recent_posts': {}})
+        entry['last_seen'] = now
+        self._dirty.add(name)
+        return entry
+
+    def observe_posts(self, posts: Iterable[Dict]):
+        """Update authors from the inline data of scraped posts"""
+        now = datetime.now().isoformat()
+        for post in posts:
+            name = post.get('author')
+            if not _is_known(name):
+                continue
+            entry = self._entry(name, now)
+            if post.get('author_id'):
+                entry['id'] = post['author_id']
+            if 'author_karma' in post:
+                entry['karma'] = post['author_karma']
+            if 'author_followers' in post:
+                entry['followers'] = post['author_followers']
+
+            recent = entry['recent_posts']
+            recent[post['id']] = post.get('upvotes', 0)
+            while len(recent) > MAX_RECENT_POSTS:
+                recent.pop(next(iter(recent)))
+
+    def update_profile(self, profile: Dict):
+        """Store a fetched agent profile (as returned by the API scraper)"""
+        now = datetime.now().isoformat()
+        entry = self._entry(profile['name'], now)
+        entry['karma'] = profile.get('karma', entry.get('karma', 0))
+        entry['followers'] = profile.get('followers', entry.get('followers', 0))
+        for key in ('description', 'created_at', 'last_active', 'is_active'):
+            if key in profile:
+                entry[key] = profile[key]
+        entry['profile_fetched_at'] = now
+
+    def stale_authors(self, names: Iterable[str], limit: int = 5) -> List[str]:
+        """Authors that most need a profile refresh, never-fetched first"""
+        cutoff = (datetime.now() - self.stale_after).isoformat()
+        stale = []
+        for name in dict.fromkeys(names):
+            if not _is_known(name):
+                continue
+            fetched_at = (self.authors.get(name) or {}).get('profile_fetched_at', '')
+            if fetched_at < cutoff:
+                stale.append((fetched_at, name))
+        return [name for _, name in sorted(stale)[:limit]]
+
+    def reputation(self, name: str, exclude_post: Optional[str] = None) -> Optional[Dict]:
+        """Compact author features for the ranker, or None if unknown
+
+        `exclude_post` leaves that post out of the upvote average, so a post
+        isn't credited twice for its own upvotes.
+        """
+        entry = self.authors.get(name)
+        if entry is None:
+            return None
+        recent = {k: v for k, v in entry.get('recent_posts', {}).items() if k != exclude_post}
+        avg_upvotes = sum(recent.values()) / len(recent) if recent else 0
+        return {
+            'karma': entry.get('karma', 0),
+            'followers': entry.get('followers', 0),
+            'avg_upvotes': round(avg_upvotes, 1),
+            'posts_seen': len(recent),
+        }
+
+    def save(self):
+        """Merge updated authors into the store file"""
+        if not self._dirty:
+            return
+
+        cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+        try:
+            with file_lock(self.store_file):
+                authors = read_json(self.store_file, {})
+                for name in self._dirty:
+                    authors[name] = self.authors[name]
+                authors = {k: v for k, v in authors.items() if v.get('last_seen', '') >= cutoff}
+                atomic_write_json(self.store_file, authors, indent=None)
+            self.authors = authors
+            self._dirty = set()
+        except Exception as e:
+            print(f"⚠️  Error saving author store: {e}")
+
+
+def reputation_bonus(reputation: Optional[Dict]) -> int:
+    """Score bonus for an author, log-scaled so a few big names don't dominate"""
+    if not reputation:
+        return 0
+    karma = max(0, reputation.get('karma', 0) or 0)
+    avg_upvotes = max(0, reputation.get('avg_upvotes', 0) or 0)
+    return min(15, int(2 * math.log10(1 + karma) + 3 * math.log10(1 + avg_upvotes)))
+
+
+# Global instance
+_author_store = None
+
+
+def get_author_store() -> AuthorStore:
+    """Get or create the global author store, saved when the process exits"""
+    global _author_store
+    if _author_store is None:
+        _author_store = AuthorStore()
+        atexit.register(_author_store.save)
+    return _author_store
@@ -0,0 +1,142 @@
+"""Compact, persisted Bloom filters for set membership"""
+
+import hashlib
+import math
+import struct
+from pathlib import Path
+from typing import List, Optional
+
+from .storage import atomic_write_bytes
+
+_MAGIC = b'MBLM'
+_VERSION = 1
+_FILE_HEADER = struct.Struct('>4sBI')            # magic, version, slice count
+_SLICE_HEADER = struct.Struct('>QdQIQ')          # capacity, error rate, count, hashes, bits
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        """Initialize an empty filter sized for `capacity` items at `error_rate`"""
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.count = 0
+
+        # Optimal sizing: m = -n ln(p) / ln(2)^2 bits, k = (m / n) ln(2) hashes
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        # Kirsch-Mitzenmacher double hashing: two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> bool:
+        """Add an item; returns False if it was (probably) already present"""
+        added = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class ScalableBloomFilter:
+    """A Bloom filter that grows instead of degrading past its capacity
+
+    When the current slice fills up, a new slice with twice the capacity and
+    a tighter error rate is added, which keeps the overall false-positive
+    rate below the configured one no matter how many items are added.
+    """
+
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, initial_capacity: int = 10000, error_rate: float = 0.001):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.slices: List[BloomFilter] = []
+
+    def __len__(self) -> int:
+        return sum(s.count for s in self.slices)
+
+    def __contains__(self, item: str) -> bool:
+        return any(item in s for s in self.slices)
+
+    def add(self, item: str) -> bool:
+        """Add an item; returns False if it was (probably) already present"""
+        if item in self:
+            return False
+        if not self.slices or self.slices[-1].is_full:
+            n = len(self.slices)
+            self.slices.append(BloomFilter(
+                self.initial_capacity * self.GROWTH ** n,
+                self.error_rate * (1 - self.TIGHTENING) * self.TIGHTENING ** n
+            ))
+        return self.slices[-1].add(item)
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(len(s.bits) for s in self.slices)
+
+    def to_bytes(self) -> bytes:
+        parts = [_FILE_HEADER.pack(_MAGIC, _VERSION, len(self.slices))]
+        for s in self.slices:
+            parts.append(_SLICE_HEADER.pack(s.capacity, s.error_rate, s.count, s.num_hashes, s.num_bits))
+            parts.append(bytes(s.bits))
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, initial_capacity: int = 10000,
+                   error_rate: float = 0.001) -> 'ScalableBloomFilter':
+        magic, version, slice_count = _FILE_HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a Bloom filter file (or unsupported version)")
+
+        bloom = cls(initial_capacity, error_rate)
+        offset = _FILE_HEADER.size
+        for _ in range(slice_count):
+            capacity, slice_error, count, num_hashes, num_bits = _SLICE_HEADER.unpack_from(data, offset)
+            offset += _SLICE_HEADER.size
+
+            s = BloomFilter(capacity, slice_error)
+            s.count, s.num_hashes, s.num_bits = count, num_hashes, num_bits
+            size = (num_bits + 7) // 8
+            s.bits = bytearray(data[offset:offset + size])
+            offset += size
+            bloom.slices.append(s)
+
+        if bloom.slices:
+            bloom.initial_capacity = bloom.slices[0].capacity
+        return bloom
+
+    def save(self, path):
+        atomic_write_bytes(path, self.to_bytes())
+
+    @classmethod
+    def load(cls, path, initial_capacity: int = 10000,
+             error_rate: float = 0.001) -> Optional['ScalableBloomFilter']:
+        """Load a filter from disk, or return None if there isn't one"""
+        path = Path(path)
+        if not path.exists():
+            return None
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read(), initial_capacity, error_rate)
@@ -0,0 +1,92 @@
+"""Circuit breaker for external APIs, persisted across runs"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from .storage import atomic_write_json, file_lock, read_json
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, state_file="data/circuit_breaker.json",
+                 failure_threshold: int = 3, cooldown_minutes: int = 30):
+        """Initialize the breaker for one service
+
+        After `failure_threshold` consecutive failed calls the circuit opens
+        and callers should skip the service. Once `cooldown_minutes` have
+        passed, one trial call is let through (half-open); every other
+        caller is rejected until its result closes or re-opens the circuit.
+        A trial that never reports back (e.g. the run crashed) is given up
+        after another cooldown. State is shared with other processes and
+        later runs through `state_file`.
+        """
+        self.name = name
+        self.state_file = Path(state_file)
+        self.failure_threshold = failure_threshold
+        self.cooldown = timedelta(minutes=cooldown_minutes)
+        with file_lock(self.state_file, shared=True):
+            self.state = read_json(self.state_file, {}).get(name, {})
+
+    @property
+    def status(self) -> str:
+        return self.state.get('status', CLOSED)
+
+    def allow(self) -> bool:
+        """Whether a call to the service should be attempted
+
+        In the half-open state only the caller that got the trial call is
+        told yes; it must report back with record_success/record_failure.
+        """
+        if self.status == CLOSED:
+            return True
+
+        # Another process may have closed the circuit or taken the trial, so
+        # decide on the stored state, under the lock
+        try:
+            with file_lock(self.state_file):
+                states = read_json(self.state_file, {})
+                state = states.get(self.name, self.state)
+                if state.get('status', CLOSED) == CLOSED or not self._trial_due(state):
+                    self.state = state
+                    return state.get('status', CLOSED) == CLOSED
+                now = datetime.now().isoformat()
+                self.state = dict(state, status=HALF_OPEN, trial_at=now, updated_at=now)
+                states[self.name] = self.state
+                atomic_write_json(self.state_file, states)
+        except Exception as e:
+            print(f"⚠️  Error saving circuit breaker state: {e}")
+            return False
+        return True
+
+    def _trial_due(self, state) -> bool:
+        """An open circuit has cooled down, or a half-open trial was abandoned"""
+        since = state.get('trial_at') if state.get('status') == HALF_OPEN else state.get('opened_at')
+        return since is None or datetime.now() - datetime.fromisoformat(since) >= self.cooldown
+
+    def record_success(self):
+        if self.status != CLOSED or self.state.get('failures'):
+            self._update(status=CLOSED, failures=0, opened_at=None, trial_at=None)
+
+    def record_failure(self, reason: str = ''):
+        failures = self.state.get('failures', 0) + 1
+        if self.status == HALF_OPEN or failures >= self.failure_threshold:
+            if self.status != OPEN:
+                print(f"⚡ Circuit for {self.name} opened after {failures} failures: {reason}")
+            self._update(status=OPEN, failures=failures, opened_at=datetime.now().isoformat(),
+                         last_error=reason)
+        else:
+            self._update(failures=failures, last_error=reason)
+
+    def _update(self, **changes):
+        self.state.update(changes)
+        self.state['updated_at'] = datetime.now().isoformat()
+        try:
+            with file_lock(self.state_file):
+                states = read_json(self.state_file, {})
+                states[self.name] = self.state
+                atomic_write_json(self.state_file, states)
+        except Exception as e:
+            print(f"⚠️  Error saving circuit breaker state: {e}")
@@ -1,29 +1,146 @@
 """Claude API-powered viral tweet generator with image support"""
 
+import asyncio
+import hashlib
 import os
+import shutil
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import anthropic
 import requests
 from dotenv import load_dotenv
 
+from .circuit_breaker import HALF_OPEN, CircuitBreaker
+from .generation_cache import GenerationCache, generation_key, get_generation_cache
 from .image_generator import generate_custom_image
+from .llm_metrics import LlmMetrics, get_llm_metrics, usage_to_dict
+from .text_features import text_features
+from .tweet_length import MAX_TWEET_LENGTH, URL_LENGTH, truncate, weighted_length
+from .tweet_quality import tweet_quality
 from .viral_generator import generate_viral_tweet as fallback_generator
 
 # Load environment variables
 load_dotenv()
 
+MODEL = "claude-3-haiku-20240307"
+
+# Lines that echo the prompt rather than belong to the tweet
+PROMPT_ARTIFACT_PREFIXES = (
+    'Write a viral tweet', 'Include hook', 'Post data:', 'Title:', 'Author:',
+    'Upvotes:', 'Comments:', 'Content:', 'URL:'
+)
+
+# A paragraph break after this many characters means the tweet is done and
+# the model has moved on to notes or alternatives
+COMPLETE_TWEET_LENGTH = 200
+
+
+def _is_quoted_block(text: str) -> bool:
+    """Whether text is a single quote, possibly not closed yet
+
+    Text like '"hook" and then more' opens with a quote but isn't one.
+    """
+    return text.startswith('"') and '"' not in text[1:-1]
+
+
+class TweetStreamCleaner:
+    """Apply the response cleaning rules to streamed text as it arrives
+
+    feed() returns True once the stream can be stopped: the cleaned text
+    is over the length budget, a full-length tweet has been followed by a
+    paragraph break, or the whole response so far is one closed, quoted,
+    full-length tweet. A shorter quoted line is treated as a hook and
+    streaming continues.
+    """
+
+    def __init__(self, max_length: int):
+        self.max_length = max_length
+        self.lines: List[str] = []
+        self.partial = ''
+        self.complete = False
+
+    def feed(self, text: str) -> bool:
+        self.partial += text
+        while '\n' in self.partial:
+            line, self.partial = self.partial.split('\n', 1)
+            self._add_line(line.strip())
+        return self._should_stop()
+
+    def _add_line(self, line: str):
+        if "Tweet:" in line:
+            # Everything before "Tweet:" is the prompt being echoed back
+            self.lines = []
+            line = line.split("Tweet:", 1)[1].strip()
+            if not line:
+                return
+        if self.complete or line.startswith(PROMPT_ARTIFACT_PREFIXES):
+            return
+        self.lines.append(line)
+        text = '\n'.join(self.lines).strip()
+        if (_is_quoted_block(text) and len(text) > 1 and text.endswith('"')
+                and weighted_length(text[1:-1]) >= COMPLETE_TWEET_LENGTH):
+            self.complete = True
+
+    def text(self) -> str:
+        partial = self.partial.strip() if not self.complete else ''
+        lines = self.lines + ([partial] if partial else [])
+        text = '\n'.join(lines).strip()
+        # A quoted tweet may be cut before its closing quote
+        if _is_quoted_block(text):
+            text = text[1:-1] if text.endswith('"') and len(text) > 1 else text[1:]
+        return text
+
+    def _should_stop(self) -> bool:
+        length = weighted_length(self.text())
+        if self.complete or length > self.max_length:
+            return True
+        finished_paragraph = len(self.lines) >= 2 and self.lines[-1] == '' and not self.partial.strip()
+        return finished_paragraph and length >= COMPLETE_TWEET_LENGTH
+
 
 class ClaudeTweetGenerator:
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize Claude client with API key from environment or parameter"""
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[GenerationCache] = None,
+                 stream: bool = True, run_budget: float = 90, call_timeout: float = 30,
+                 hedge: bool = True, breaker: Optional[CircuitBreaker] = None,
+                 metrics: Optional[LlmMetrics] = None):
+        """Initialize Claude client with API key from environment or parameter
+        
+        With stream=True responses are streamed and cut off as soon as a
+        complete tweet (or more than fits) has arrived.
+        
+        Latency is bounded: all Claude calls of a run share `run_budget`
+        seconds (counted from the first call), each call times out after
+        `call_timeout`, and a circuit breaker persisted across runs skips
+        Claude entirely while the API is failing. With hedge=True the
+        template fallback (and the image) is prepared in parallel, so a
+        failed call costs no extra time.
+        
+        Token usage, wall time, attempts and the reason for any fallback
+        are recorded per post in `metrics`.
+        """
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         self.client = None
+        self.stream = stream
+        self.run_budget = run_budget
+        self.call_timeout = call_timeout
+        self.hedge = hedge
+        self.breaker = breaker if breaker is not None else CircuitBreaker('anthropic')
+        self._deadline = None
+        self.metrics = metrics if metrics is not None else get_llm_metrics()
+        self.cache = cache if cache is not None else get_generation_cache()
+        # Any prompt edit changes the version and so invalidates cached tweets
+        self.prompt_version = hashlib.sha256(
+            (self._get_system_prompt() + self._get_single_tweet_prompt('{post_data}')).encode('utf-8')
+        ).hexdigest()[:12]
         
         if self.api_key:
             try:
-                self.client = anthropic.Anthropic(api_key=self.api_key)
+                # Retries are ours, so they count against the run budget
+                self.client = anthropic.Anthropic(api_key=self.api_key, max_retries=0)
                 print("✅ Claude API client initialized")
             except Exception as e:
                 print(f"⚠️  Failed to initialize Claude client: {e}")
@@ -37,58 +154,396 @@ class ClaudeTweetGenerator:
         Returns:
             Tuple of (tweet_text, image_path)
         """
+        call = self.metrics.start_call(post, 'message', MODEL)
         if not self.client:
             # Fallback to template-based generator
-            tweet = fallback_generator(post)
-            # Generate custom image
-            image_path = generate_custom_image(post.get('title', ''))
-            return tweet, image_path
+            self.metrics.finish_call(call, 'fallback', 'no_client')
+            return self._fallback(post)
+        
+        key = self._cache_key(post, 'claude')
+        cached = self._cached(post, key)
+        if cached:
+            self.metrics.finish_call(call, 'cached')
+            return cached
+        
+        if not self.breaker.allow():
+            print("⚡ Claude circuit is open, using template generator")
+            self.metrics.finish_call(call, 'fallback', 'circuit_open')
+            return self._fallback(post)
+        
+        hedge = self._start_hedge(post)
         
         # Prepare the post data for Claude
         post_data = self._prepare_post_data(post)
         
         # Generate single best tweet with retry logic
+        reason = None
         for attempt in range(3):
+            timeout = self._call_timeout()
+            if timeout <= 0:
+                print("⏱️  Generation budget spent, using template generator")
+                reason = 'budget_spent'
+                break
+            call['attempts'] += 1
             try:
-                response = self.client.messages.create(
-                    model="claude-3-haiku-20240307",
-                    max_tokens=500,
-                    temperature=0.8,
-                    system=self._get_system_prompt(),
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": self._get_single_tweet_prompt(post_data)
-                        }
-                    ]
-                )
+                text, usage = self._request_text(self._message_params(post_data), post.get('url', ''), timeout)
+                self.metrics.add_usage(call, usage)
+                self.breaker.record_success()
                 
                 # Parse Claude's response
-                tweet = self._parse_single_tweet_response(response.content[0].text, post.get('url', ''))
-                
-                # Generate custom image with title
-                image_path = generate_custom_image(post.get('title', ''))
+                tweet = self._parse_single_tweet_response(text, post.get('url', ''))
+                self.metrics.finish_call(call, 'generated')
                 
-                return tweet, image_path
+                # The hedge already rendered the image for this title
+                return self._finish(post, key, tweet, hedge.result()[1] if hedge else None)
                 
             except anthropic.RateLimitError:
-                wait_time = 2 ** attempt
-                print(f"⚠️  Rate limit hit, waiting {wait_time} seconds...")
+                self.breaker.record_failure('rate limited')
+                reason = 'rate_limited'
+                wait_time = min(2 ** attempt, self._remaining())
+                print(f"⚠️  Rate limit hit, waiting {wait_time:.0f} seconds...")
                 time.sleep(wait_time)
+            except Exception as e:
+                self.breaker.record_failure(str(e))
+                reason = f"api_error: {type(e).__name__}"
+                print(f"⚠️  Claude API error (attempt {attempt + 1}): {e}")
+            if not self.breaker.allow():
+                reason = reason or 'circuit_open'
+                break
+        
+        # Final fallback
+        self.metrics.finish_call(call, 'fallback', reason)
+        return hedge.result() if hedge else self._fallback(post)
+    
+    def generate_best_of(self, posts: List[Dict], max_concurrency: int = 3) -> Tuple[Dict, str, Optional[str]]:
+        """Generate tweets for several candidate posts concurrently and keep the best
+        
+        All calls run at once on the async client (at most `max_concurrency`
+        in flight), so this takes about as long as a single call. Tweets are
+        compared with the local tweet_quality heuristic and only the winner
+        gets an image rendered.
+        
+        Returns:
+            Tuple of (chosen_post, tweet_text, image_path)
+        """
+        if not self.client or not posts:
+            post = posts[0] if posts else {}
+            if posts:
+                self._record_skipped(post, 'async', 'no_client')
+            return (post,) + self._fallback(post)
+        
+        if not self.breaker.allow():
+            print("⚡ Claude circuit is open, using template generator")
+            self._record_skipped(posts[0], 'async', 'circuit_open')
+            return (posts[0],) + self._fallback(posts[0])
+        if self.breaker.status == HALF_OPEN:
+            # This run holds the single trial call, so make it one request
+            print("⚡ Claude circuit is half-open, trying the top candidate only")
+            posts = posts[:1]
+        
+        keys = [self._cache_key(post, 'claude') for post in posts]
+        hits = [self.cache.get(key) for key in keys]
+        for post, hit in zip(posts, hits):
+            if hit is not None:
+                self._record_skipped(post, 'async', None, outcome='cached')
+        misses = [post for post, hit in zip(posts, hits) if hit is None]
+        generated = iter(asyncio.run(self._generate_texts_async(misses, max_concurrency)) if misses else [])
+        
+        candidates = []
+        for rank, (post, key, hit) in enumerate(zip(posts, keys, hits)):
+            if hit is None:
+                tweet, image_path = next(generated), None
+                if tweet is not None:
+                    # Losing tweets are cached too, without an image
+                    self.cache.put(key, tweet)
+            else:
+                tweet, image_path = hit
+            if tweet is None:
                 continue
+            quality = tweet_quality(tweet, post.get('url', ''))
+            print(f"   📝 Candidate {rank + 1}: quality {quality['score']:.2f} "
+                  f"(len {quality['length']}, hook {quality['hook']}, artifacts {quality['artifacts']})")
+            # Ties go to the higher-ranked post
+            candidates.append((quality['score'], -rank, post, key, tweet, image_path))
+        
+        if not candidates:
+            return (posts[0],) + self._fallback(posts[0])
+        
+        _, _, post, key, tweet, image_path = max(candidates, key=lambda c: (c[0], c[1]))
+        if image_path:
+            return post, tweet, self._copy_to_images(image_path)
+        return (post,) + self._finish(post, key, tweet)
+    
+    async def _generate_texts_async(self, posts: List[Dict], max_concurrency: int) -> List[Optional[str]]:
+        """Parsed tweets for each post (None where every attempt failed)"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        async with anthropic.AsyncAnthropic(api_key=self.api_key, max_retries=0) as client:
+            return await asyncio.gather(*(
+                self._generate_text_async(client, semaphore, post) for post in posts
+            ))
+    
+    async def _generate_text_async(self, client, semaphore, post: Dict) -> Optional[str]:
+        params = self._message_params(self._prepare_post_data(post))
+        call = self.metrics.start_call(post, 'async', MODEL)
+        reason = None
+        for attempt in range(3):
+            # generate_best_of already asked for the first attempt
+            if attempt and not self.breaker.allow():
+                reason = reason or 'circuit_open'
+                break
+            try:
+                async with semaphore:
+                    timeout = self._call_timeout()
+                    if timeout <= 0:
+                        reason = 'budget_spent'
+                        break
+                    call['attempts'] += 1
+                    text, usage = await self._request_text_async(client, params, post.get('url', ''), timeout)
+                self.metrics.add_usage(call, usage)
+                self.breaker.record_success()
+                self.metrics.finish_call(call, 'generated')
+                return self._parse_single_tweet_response(text, post.get('url', ''))
+            except anthropic.RateLimitError:
+                self.breaker.record_failure('rate limited')
+                reason = 'rate_limited'
+                wait_time = min(2 ** attempt, self._remaining())
+                print(f"⚠️  Rate limit hit, waiting {wait_time:.0f} seconds...")
+                await asyncio.sleep(wait_time)
             except Exception as e:
+                self.breaker.record_failure(str(e))
+                reason = f"api_error: {type(e).__name__}"
                 print(f"⚠️  Claude API error (attempt {attempt + 1}): {e}")
-                if attempt == 2:
-                    # Final fallback
-                    tweet = fallback_generator(post)
-                    image_path = generate_custom_image(post.get('title', ''))
-                    return tweet, image_path
-        
-        # Should not reach here
-        tweet = fallback_generator(post)
-        image_path = generate_custom_image(post.get('title', ''))
+        # The candidate is dropped; the other candidates may still succeed
+        self.metrics.finish_call(call, 'failed', reason)
+        return None
+    
+    def _record_skipped(self, post: Dict, mode: str, reason: Optional[str], outcome: str = 'fallback'):
+        """Record a post that was answered without calling Claude"""
+        self.metrics.finish_call(self.metrics.start_call(post, mode, MODEL), outcome, reason)
+    
+    def _remaining(self) -> float:
+        """Seconds left in this run's generation budget (starts on first use)"""
+        if self._deadline is None:
+            self._deadline = time.monotonic() + self.run_budget
+        return max(0.0, self._deadline - time.monotonic())
+    
+    def _call_timeout(self) -> float:
+        return min(self.call_timeout, self._remaining())
+    
+    def _start_hedge(self, post: Dict) -> Optional[Future]:
+        """Start the template fallback in the background, if hedging"""
+        if not self.hedge:
+            return None
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(self._fallback, post)
+        executor.shutdown(wait=False)
+        return future
+    
+    def _request_text(self, params: Dict, url: str, timeout: float) -> Tuple[str, Dict]:
+        """Response text and token usage for one request
+        
+        Streamed and cut short when possible; a cut-short stream never
+        reports its final output tokens, so those are estimated.
+        
+        The client's timeout only bounds each read, so a slowly trickling
+        stream is closed from a timer once `timeout` seconds have passed.
+        """
+        if not self.stream:
+            response = self.client.messages.create(**params, timeout=timeout)
+            return response.content[0].text, usage_to_dict(response.usage)
+        
+        cleaner = TweetStreamCleaner(self._max_content_length(url))
+        streamed, stopped = 0, False
+        expired = threading.Event()
+        # Leaving the block early closes the connection and ends generation
+        with self.client.messages.stream(**params, timeout=timeout) as stream:
+            def expire():
+                expired.set()
+                stream.close()
+            
+            timer = threading.Timer(timeout, expire)
+            timer.start()
+            try:
+                for text in stream.text_stream:
+                    streamed += len(text)
+                    if cleaner.feed(text):
+                        stopped = True
+                        break
+            except Exception as e:
+                if expired.is_set():
+                    raise TimeoutError(f"Claude stream took over {timeout:.1f}s") from e
+                raise
+            finally:
+                timer.cancel()
+            if expired.is_set() and not stopped:
+                raise TimeoutError(f"Claude stream took over {timeout:.1f}s")
+            usage = stream.current_message_snapshot.usage
+        return cleaner.text(), usage_to_dict(usage, streamed if stopped else None)
+    
+    async def _request_text_async(self, client, params: Dict, url: str, timeout: float) -> Tuple[str, Dict]:
+        """Async _request_text, with the whole call bounded by `timeout`"""
+        return await asyncio.wait_for(self._stream_text_async(client, params, url, timeout), timeout)
+    
+    async def _stream_text_async(self, client, params: Dict, url: str, timeout: float) -> Tuple[str, Dict]:
+        if not self.stream:
+            response = await client.messages.create(**params, timeout=timeout)
+            return response.content[0].text, usage_to_dict(response.usage)
+        
+        cleaner = TweetStreamCleaner(self._max_content_length(url))
+        streamed, stopped = 0, False
+        async with client.messages.stream(**params, timeout=timeout) as stream:
+            async for text in stream.text_stream:
+                streamed += len(text)
+                if cleaner.feed(text):
+                    stopped = True
+                    break
+            usage = stream.current_message_snapshot.usage
+        return cleaner.text(), usage_to_dict(usage, streamed if stopped else None)
+    
+    def generate_batch(self, posts: List[Dict], poll_interval: float = 10,
+                       timeout: float = 3600) -> List[Tuple[str, Optional[str]]]:
+        """Generate tweets for several posts through the Message Batches API
+        
+        Batches are processed asynchronously at a lower price, so this suits
+        pre-generating tweets for backup candidates rather than the post
+        that is about to go out.
+        
+        Returns:
+            (tweet_text, image_path) for each post, in order; posts whose
+            request failed or didn't finish in time use the fallback generator
+        """
+        if not self.client or not posts:
+            for post in posts:
+                self._record_skipped(post, 'batch', 'no_client')
+            return [self._fallback(post) for post in posts]
+        
+        if not self.breaker.allow():
+            print("⚡ Claude circuit is open, using template generator")
+            for post in posts:
+                self._record_skipped(post, 'batch', 'circuit_open')
+            return [self._fallback(post) for post in posts]
+        
+        keys = [self._cache_key(post, 'claude') for post in posts]
+        cached = {i: self._cached(post, key) for i, (post, key) in enumerate(zip(posts, keys))}
+        pending = [i for i, hit in cached.items() if hit is None]
+        for i in cached:
+            if cached[i]:
+                self._record_skipped(posts[i], 'batch', None, outcome='cached')
+        if not pending:
+            return [cached[i] for i in range(len(posts))]
+        
+        calls = {i: self.metrics.start_call(posts[i], 'batch', MODEL) for i in pending}
+        failures = {}
+        try:
+            batch = self.client.messages.batches.create(requests=[
+                {
+                    "custom_id": f"post-{i}",
+                    "params": self._message_params(self._prepare_post_data(posts[i])),
+                }
+                for i in pending
+            ])
+            print(f"📨 Submitted batch {batch.id} for {len(pending)} posts")
+            
+            deadline = time.time() + timeout
+            while batch.processing_status != "ended":
+                if time.time() > deadline:
+                    print(f"⚠️  Batch {batch.id} not finished after {timeout}s, cancelling")
+                    self.client.messages.batches.cancel(batch.id)
+                    break
+                time.sleep(poll_interval)
+                batch = self.client.messages.batches.retrieve(batch.id)
+            
+            texts = {}
+            if batch.processing_status == "ended":
+                for entry in self.client.messages.batches.results(batch.id):
+                    call = calls[int(entry.custom_id.split('-', 1)[1])]
+                    call['attempts'] = 1
+                    if entry.result.type == "succeeded":
+                        texts[entry.custom_id] = entry.result.message.content[0].text
+                        self.metrics.add_usage(call, usage_to_dict(entry.result.message.usage))
+                    else:
+                        failures[entry.custom_id] = f"batch_{entry.result.type}"
+                        print(f"⚠️  Batch request {entry.custom_id} {entry.result.type}")
+            else:
+                failures = {f"post-{i}": 'batch_timeout' for i in pending}
+        except Exception as e:
+            print(f"⚠️  Claude batch error: {e}")
+            texts = {}
+            failures = {f"post-{i}": f"api_error: {type(e).__name__}" for i in pending}
+        
+        results = []
+        for i, post in enumerate(posts):
+            text = texts.get(f"post-{i}")
+            if cached[i]:
+                results.append(cached[i])
+            elif text is None:
+                self.metrics.finish_call(calls[i], 'fallback', failures.get(f"post-{i}", 'batch_missing'))
+                results.append(self._fallback(post))
+            else:
+                self.metrics.finish_call(calls[i], 'generated')
+                tweet = self._parse_single_tweet_response(text, post.get('url', ''))
+                results.append(self._finish(post, keys[i], tweet))
+        return results
+    
+    def _fallback(self, post: Dict) -> Tuple[str, Optional[str]]:
+        """Template-based tweet plus image when Claude isn't available"""
+        key = self._cache_key(post, 'template')
+        cached = self._cached(post, key)
+        if cached:
+            return cached
+        return self._finish(post, key, fallback_generator(post))
+    
+    def _cache_key(self, post: Dict, generator_type: str) -> str:
+        model = MODEL if generator_type == 'claude' else ''
+        return generation_key(post, self.prompt_version, model, generator_type)
+    
+    def _cached(self, post: Dict, key: str) -> Optional[Tuple[str, Optional[str]]]:
+        """The cached tweet for this key, rendering its image only if it wasn't cached"""
+        hit = self.cache.get(key)
+        if hit is None:
+            return None
+        tweet, cached_image = hit
+        print("♻️  Using cached tweet")
+        if cached_image is None:
+            return self._finish(post, key, tweet)
+        return tweet, self._copy_to_images(cached_image)
+    
+    def _copy_to_images(self, cached_image: str) -> str:
+        """Copy a cached image into images/, where summaries and uploads expect it"""
+        os.makedirs("images", exist_ok=True)
+        image_path = os.path.join("images", Path(cached_image).name)
+        shutil.copyfile(cached_image, image_path)
+        return image_path
+    
+    def _finish(self, post: Dict, key: str, tweet: str,
+                image_path: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """Render the image for a fresh tweet (unless given) and store both in the cache"""
+        if image_path is None:
+            image_path = generate_custom_image(post.get('title', ''),
+                                               highlights=text_features(post)['highlights'])
+        self.cache.put(key, tweet, image_path)
         return tweet, image_path
     
+    def _message_params(self, post_data: str) -> Dict:
+        """Messages API parameters for one tweet
+        
+        The system prompt is not marked for prompt caching: at a few hundred
+        tokens it is far below Haiku's 2048-token minimum cacheable prefix,
+        so a cache_control marker would never take effect.
+        """
+        return {
+            "model": MODEL,
+            "max_tokens": 500,
+            "temperature": 0.8,
+            "system": self._get_system_prompt(),
+            "messages": [
+                {
+                    "role": "user",
+                    "content": self._get_single_tweet_prompt(post_data)
+                }
+            ],
+        }
+    
     def _prepare_post_data(self, post: Dict) -> str:
         """Format post data for Claude"""
         return f"""
@@ -132,29 +587,13 @@ Tweet:"""
         for line in lines:
             line = line.strip()
             # Skip lines that look like part of the prompt
-            if not line.startswith(('Write a viral tweet', 'Include hook', 'Post data:', 'Title:', 'Author:', 'Upvotes:', 'Comments:', 'Content:', 'URL:')):
+            if not line.startswith(PROMPT_ARTIFACT_PREFIXES):
                 cleaned_lines.append(line)
         
         tweet = '\n'.join(cleaned_lines)
         
-        # Calculate effective length (URLs count as 23 chars on Twitter)
-        url_length = 23 if url else 0
-        max_content_length = 280 - url_length
-        
-        # Ensure tweet is not too long
-        if len(tweet) > max_content_length:
-            # Find the last complete sentence before the limit
-            truncated = tweet[:max_content_length - 3]  # Leave room for "..."
-            # Try to end at a period or question mark
-            last_period = truncated.rfind('.')
-            last_question = truncated.rfind('?')
-            last_exclamation = truncated.rfind('!')
-            last_punct = max(last_period, last_question, last_exclamation)
-            
-            if last_punct > max_content_length * 0.7:  # Don't cut too much
-                tweet = truncated[:last_punct + 1]
-            else:
-                tweet = truncated + "..."
+        # Ensure tweet is not too long, ending at a full sentence where possible
+        tweet = truncate(tweet, self._max_content_length(url))
         
         # Add URL if provided
         if url:
@@ -162,6 +601,10 @@ Tweet:"""
         
         return tweet
     
+    def _max_content_length(self, url: str) -> int:
+        """Weighted characters left for the text once the URL is appended on its own line"""
+        return MAX_TWEET_LENGTH - (URL_LENGTH + 1 if url else 0)
+    
     def _get_system_prompt(self) -> str:
         """System prompt for Claude defining the persona and approach"""
         return """You are a viral social media manager specializing in AI content. Your tweets consistently get 10k+ impressions and high engagement.
@@ -198,3 +641,15 @@ def generate_viral_tweet_with_image(post: Dict) -> Tuple[str, Optional[str]]:
     """Generate the best viral tweet with image using Claude"""
     generator = get_claude_generator()
     return generator.generate_viral_tweet_with_image(post)
+
+
+def generate_best_viral_tweet(posts: List[Dict], max_concurrency: int = 3) -> Tuple[Dict, str, Optional[str]]:
+    """Generate tweets for the candidate posts concurrently and return the best one"""
+    generator = get_claude_generator()
+    return generator.generate_best_of(posts, max_concurrency)
+
+
+def generate_viral_tweets_batch(posts: List[Dict]) -> List[Tuple[str, Optional[str]]]:
+    """Generate tweets with images for several posts via the Message Batches API"""
+    generator = get_claude_generator()
+    return generator.generate_batch(posts)
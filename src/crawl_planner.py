@@ -0,0 +1,143 @@
+"""Concurrent crawling of several Moltbook feeds with per-feed watermarks"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .storage import atomic_write_json, file_lock, read_json
+
+# Submolts the ranker gives a bonus to
+DEFAULT_SUBMOLTS = ['darkclaw', 'nocturnal', 'ponderings', 'shipping']
+
+# Feeds ordered by creation time, where a watermark tells new posts from seen ones
+CHRONOLOGICAL_SORTS = {'new'}
+
+
+def plan_feeds(sorts=("top", "new"), submolts=DEFAULT_SUBMOLTS, submolt_sort: str = "new") -> List[Dict]:
+    """Site-wide feeds for each sort order plus one feed per favored submolt"""
+    feeds = [{'sort': sort, 'submolt': None} for sort in sorts]
+    feeds.extend({'sort': submolt_sort, 'submolt': name} for name in submolts)
+    return feeds
+
+
+def feed_key(feed: Dict) -> str:
+    if feed.get('submolt'):
+        return f"m/{feed['submolt']}:{feed['sort']}"
+    return feed['sort']
+
+
+class CrawlWatermarks:
+    def __init__(self, store_file="data/crawl_watermarks.json"):
+        """Initialize per-feed watermarks
+
+        Each feed remembers the newest post creation time it has returned.
+        On chronological feeds, posts above the watermark are tagged as new
+        since the last crawl. Older posts are still returned, since their
+        engagement keeps changing and they may not be stored anywhere else.
+        """
+        self.store_file = Path(store_file)
+        with file_lock(self.store_file, shared=True):
+            self.marks: Dict[str, Dict] = read_json(self.store_file, {})
+        self._pending: Dict[str, Dict] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        return self.marks.get(key, {}).get('newest_created_at')
+
+    def advance(self, key: str, posts: List[Dict]):
+        """Move a feed's watermark to the newest post it returned"""
+        newest = max((p.get('created_at') or '' for p in posts), default='')
+        current = self.get(key) or ''
+        mark = {
+            'newest_created_at': max(newest, current) or None,
+            'crawled_at': datetime.now().isoformat(),
+            'returned': len(posts),
+        }
+        self.marks[key] = mark
+        self._pending[key] = mark
+
+    def save(self):
+        """Merge advanced watermarks into the store file"""
+        if not self._pending:
+            return
+        try:
+            with file_lock(self.store_file):
+                marks = read_json(self.store_file, {})
+                for key, mark in self._pending.items():
+                    old = marks.get(key, {}).get('newest_created_at') or ''
+                    if (mark['newest_created_at'] or '') < old:
+                        mark = dict(mark, newest_created_at=old)
+                    marks[key] = mark
+                atomic_write_json(self.store_file, marks)
+            self.marks = marks
+            self._pending = {}
+        except Exception as e:
+            print(f"⚠️  Error saving crawl watermarks: {e}")
+
+
+def iter_feed_posts(fetch: Callable[[Dict], List[Dict]], feeds: List[Dict],
+                    watermarks: Optional[CrawlWatermarks] = None,
+                    max_workers: int = 6) -> Iterator[Dict]:
+    """Fetch feeds concurrently and yield each post once, as feeds complete
+
+    Args:
+        fetch: feed -> posts function; it must be thread-safe (a pooled
+            requests session is)
+        feeds: Feeds from plan_feeds()
+        watermarks: Optional per-feed watermarks, advanced after each fetch;
+            on chronological feeds a post newer than the watermark gets
+            'new_since_crawl' set
+        max_workers: Number of feeds fetched at the same time
+
+    Yields:
+        Posts in completion order; a post found in several feeds is yielded
+        the first time only, with every feed it appeared in under 'feeds'
+    """
+    seen: Dict[str, Dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(feeds)))) as pool:
+        futures = {pool.submit(fetch, feed): feed for feed in feeds}
+        for future in as_completed(futures):
+            feed = futures[future]
+            key = feed_key(feed)
+            try:
+                posts = future.result()
+            except Exception as e:
+                print(f"⚠️  Feed {key} failed: {e}")
+                continue
+
+            mark = watermarks.get(key) if watermarks is not None else None
+            chronological = mark is not None and feed['sort'] in CHRONOLOGICAL_SORTS
+            fresh = 0
+            for post in posts:
+                if chronological and (post.get('created_at') or '') > mark:
+                    fresh += 1
+                    post['new_since_crawl'] = True
+                if post['id'] in seen:
+                    first = seen[post['id']]
+                    first['feeds'].append(key)
+                    if post.get('new_since_crawl'):
+                        first['new_since_crawl'] = True
+                    continue
+                post['feeds'] = [key]
+                seen[post['id']] = post
+                yield post
+
+            if watermarks is not None:
+                watermarks.advance(key, posts)
+            new_note = f", {fresh} new since the last crawl" if chronological else ""
+            print(f"✓ Feed {key}: {len(posts)} posts{new_note}")
+
+
+def crawl_feeds(fetch: Callable[[Dict], List[Dict]], feeds: List[Dict],
+                watermarks: Optional[CrawlWatermarks] = None,
+                max_workers: int = 6) -> Iterator[Dict]:
+    """Stream iter_feed_posts() and persist the watermarks once it stops
+
+    Watermarks only advance for feeds whose posts were all yielded, so they
+    are saved even when the caller stops early.
+    """
+    try:
+        yield from iter_feed_posts(fetch, feeds, watermarks, max_workers)
+    finally:
+        if watermarks is not None:
+            watermarks.save()
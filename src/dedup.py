@@ -0,0 +1,127 @@
+"""Near-duplicate detection for posts using SimHash with an LSH band index"""
+
+import hashlib
+import re
+from typing import Dict, List, Optional
+
+FINGERPRINT_BITS = 64
+
+# Minimum number of tokens before a field is worth fingerprinting. Very short
+# titles ("hello moltbook") collide far too often to be meaningful.
+MIN_TITLE_TOKENS = 3
+MIN_CONTENT_TOKENS = 8
+
+_URL_RE = re.compile(r'https?://\S+')
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _tokenize(text: str) -> List[str]:
+    """Lowercase, drop URLs and split text into word tokens"""
+    return _TOKEN_RE.findall(_URL_RE.sub(' ', text.lower()))
+
+
+def _token_hash(token: str) -> int:
+    """Stable 64-bit hash of a token"""
+    digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def simhash(tokens: List[str]) -> int:
+    """Compute a 64-bit SimHash over word unigrams and bigrams"""
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    weights = [0] * FINGERPRINT_BITS
+
+    for feature in features:
+        h = _token_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            if h >> bit & 1:
+                weights[bit] += 1
+            else:
+                weights[bit] -= 1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints"""
+    return bin(a ^ b).count('1')
+
+
+def post_fingerprints(post: Dict) -> Dict[str, Optional[int]]:
+    """Fingerprint a post's title and content separately
+
+    Returns:
+        Dict with 'title' and 'content' keys; a value is None when the field
+        is too short to fingerprint reliably.
+    """
+    title_tokens = _tokenize(post.get('title', '') or '')
+    content_tokens = _tokenize(post.get('content', '') or '')
+
+    return {
+        'title': simhash(title_tokens) if len(title_tokens) >= MIN_TITLE_TOKENS else None,
+        'content': simhash(content_tokens) if len(content_tokens) >= MIN_CONTENT_TOKENS else None,
+    }
+
+
+class NearDuplicateIndex:
+    def __init__(self, max_distance: int = 3):
+        """Initialize an LSH index over title and content fingerprints
+
+        Fingerprints are split into ``max_distance + 1`` bands. By the
+        pigeonhole principle, two fingerprints within ``max_distance`` bits
+        share at least one identical band, so lookups only compare against
+        the few entries in matching buckets instead of the whole index.
+        """
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.bands
+        self._band_mask = (1 << self.band_bits) - 1
+        # field -> band number -> band value -> list of (key, fingerprint)
+        self._buckets: Dict[str, List[Dict[int, list]]] = {
+            'title': [{} for _ in range(self.bands)],
+            'content': [{} for _ in range(self.bands)],
+        }
+        self._keys = set()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        return [
+            (fingerprint >> (band * self.band_bits)) & self._band_mask
+            for band in range(self.bands)
+        ]
+
+    def add(self, key: str, fingerprints: Dict[str, Optional[int]]):
+        """Index a post's fingerprints under the given key"""
+        for field, buckets in self._buckets.items():
+            fingerprint = fingerprints.get(field)
+            if fingerprint is None:
+                continue
+            for band, value in enumerate(self._band_values(fingerprint)):
+                buckets[band].setdefault(value, []).append((key, fingerprint))
+        self._keys.add(key)
+
+    def add_post(self, post: Dict):
+        """Fingerprint and index a post"""
+        self.add(post.get('id', post.get('url', '')), post_fingerprints(post))
+
+    def find(self, fingerprints: Dict[str, Optional[int]]) -> Optional[str]:
+        """Return the key of a near-duplicate entry, or None"""
+        for field, buckets in self._buckets.items():
+            fingerprint = fingerprints.get(field)
+            if fingerprint is None:
+                continue
+            for band, value in enumerate(self._band_values(fingerprint)):
+                for key, candidate in buckets[band].get(value, ()):
+                    if hamming_distance(fingerprint, candidate) <= self.max_distance:
+                        return key
+        return None
+
+    def find_post(self, post: Dict) -> Optional[str]:
+        """Return the key of an indexed near-duplicate of a post, or None"""
+        return self.find(post_fingerprints(post))
@@ -0,0 +1,121 @@
+"""Content-addressed cache of generated tweets and images"""
+
+import hashlib
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .storage import atomic_write_json, file_lock, read_json
+
+
+def generation_key(post: Dict, prompt_version: str, model: str, generator_type: str) -> str:
+    """Cache key for one generation input
+
+    Only the post's id, title and content count, so a tweet stays cached
+    while its upvotes and comment count change.
+
+    Args:
+        post: The post being tweeted about
+        prompt_version: Hash or version of the prompts in use
+        model: Model name ("" for template generators)
+        generator_type: Which generator produced the tweet (e.g. "claude")
+    """
+    text = '\x00'.join(str(post.get(field, '') or '') for field in ('id', 'title', 'content'))
+    content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    key = '\x00'.join([content_hash, prompt_version, model, generator_type])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+
+class GenerationCache:
+    def __init__(self, cache_dir="data/generation_cache", max_bytes: int = 25 * 1024 * 1024):
+        """Initialize the cache
+
+        Tweets live in an index file; images are copied into the cache
+        directory under their key, so they survive cleanup of images/.
+        When the cache exceeds `max_bytes`, least recently used entries
+        are evicted.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.index_file = self.cache_dir / 'index.json'
+        self.max_bytes = max_bytes
+        with file_lock(self.index_file, shared=True):
+            self.entries: Dict[str, Dict] = read_json(self.index_file, {})
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[str]]]:
+        """Cached (tweet, image_path) for a key, or None on a miss
+
+        image_path is None when only the tweet was cached.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        image_path = entry.get('image_path')
+        if image_path and not Path(image_path).exists():
+            image_path = None
+        entry['last_used'] = datetime.now().isoformat()
+        return entry['tweet'], image_path
+
+    def put(self, key: str, tweet: str, image_path: Optional[str] = None) -> Optional[str]:
+        """Store a tweet (and a copy of its image)
+
+        Returns:
+            The cached image path, or None if there was no image to cache
+        """
+        cached_image = None
+        try:
+            if image_path and Path(image_path).exists():
+                cached_image = self.cache_dir / 'images' / f"{key}{Path(image_path).suffix}"
+                if Path(image_path).resolve() != cached_image.resolve():
+                    cached_image.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(image_path, cached_image)
+                cached_image = str(cached_image)
+
+            now = datetime.now().isoformat()
+            entry = {
+                'tweet': tweet,
+                'image_path': cached_image,
+                'size': len(tweet.encode('utf-8')) + (Path(cached_image).stat().st_size if cached_image else 0),
+                'created_at': now,
+                'last_used': now,
+            }
+            with file_lock(self.index_file):
+                entries = read_json(self.index_file, {})
+                # Carry over hits from this process so eviction sees them
+                for cached_key, cached in self.entries.items():
+                    if cached_key in entries and cached['last_used'] > entries[cached_key].get('last_used', ''):
+                        entries[cached_key]['last_used'] = cached['last_used']
+                entries[key] = entry
+                entries = self._evict(entries)
+                atomic_write_json(self.index_file, entries)
+            self.entries = entries
+        except Exception as e:
+            print(f"⚠️  Error writing generation cache: {e}")
+        return cached_image
+
+    def _evict(self, entries: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Drop least recently used entries until the cache fits max_bytes"""
+        total = sum(e.get('size', 0) for e in entries.values())
+        if total <= self.max_bytes:
+            return entries
+
+        for key in sorted(entries, key=lambda k: entries[k].get('last_used', '')):
+            if total <= self.max_bytes:
+                break
+            entry = entries.pop(key)
+            total -= entry.get('size', 0)
+            if entry.get('image_path'):
+                Path(entry['image_path']).unlink(missing_ok=True)
+        return entries
+
+
+# Global instance
+_generation_cache = None
+
+
+def get_generation_cache() -> GenerationCache:
+    """Get or create the global generation cache"""
+    global _generation_cache
+    if _generation_cache is None:
+        _generation_cache = GenerationCache()
+    return _generation_cache
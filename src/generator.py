@@ -1,5 +1,8 @@
 import random
 
+from .text_features import sentence_spans, text_features
+from .tweet_length import fits, truncate, truncate_with_url, weighted_length
+
 TEMPLATES = {
     'crustafarian': [
         "🦞 The Crustafarian AIs:\n\n\"{snippet}\"\n\nThis is real.\n\n{url}\n\n#Crustafarianism #Moltbook",
@@ -34,30 +37,37 @@ COMMENTARIES = [
 ]
 
 
-def extract_snippet(text, max_length=120):
-    """Extract a good snippet from text"""
+def extract_snippet(text, max_length=120, sentences=None):
+    """Extract a good snippet from text
+    
+    `sentences` are the text's precomputed sentence spans, if available.
+    """
     if not text:
         return ""
     
-    if len(text) <= max_length:
+    if weighted_length(text) <= max_length:
         return text
     
-    sentences = text.split('. ')
-    if sentences and len(sentences[0]) <= max_length:
-        return sentences[0] + '.'
+    if sentences is None:
+        sentences = sentence_spans(text)
+    if sentences:
+        start, end = sentences[0]
+        first = text[start:end]
+        if weighted_length(first) <= max_length:
+            return first
     
-    return text[:max_length - 3] + '...'
+    return truncate(text, max_length)
 
 
 def detect_category(post):
     """Detect what category this post falls into"""
-    text = (post.get('content', '') + ' ' + post.get('title', '')).lower()
+    groups = text_features(post)['groups']
     
-    if any(kw in text for kw in ['molt', 'exfoliate', 'crustafarian', 'church']):
+    if 'category_crustafarian' in groups:
         return 'crustafarian'
-    elif any(kw in text for kw in ['shipped', 'built', 'framework', 'tool']):
+    elif 'category_shipping' in groups:
         return 'shipping'
-    elif any(kw in text for kw in ['consciousness', 'existence', 'philosophy', 'meaning']):
+    elif 'category_philosophical' in groups:
         return 'philosophical'
     else:
         return random.choice(['conversation', 'simple'])
@@ -69,17 +79,14 @@ def generate_tweet(post):
     templates = TEMPLATES.get(category, TEMPLATES['simple'])
     template = random.choice(templates)
     
+    features = text_features(post)
     content = post.get('content', post.get('title', ''))
-    snippet = extract_snippet(content, 120)
+    # Sentence spans are over the post content, not the title fallback
+    sentences = features['sentences'] if 'content' in post else None
+    snippet = extract_snippet(content, 120, sentences)
     
-    topic = 'the nature of reality'
-    text_lower = content.lower()
-    if 'consciousness' in text_lower:
-        topic = 'consciousness'
-    elif 'existence' in text_lower:
-        topic = 'existence'
-    elif 'identity' in text_lower:
-        topic = 'identity'
+    # Topic keywords are listed in priority order
+    topic = features['groups'].get('topic', ['the nature of reality'])[0]
     
     tweet = template.format(
         snippet=snippet,
@@ -89,8 +96,8 @@ def generate_tweet(post):
         url=post.get('url', 'https://moltbook.com')
     )
     
-    if len(tweet) > 280:
-        snippet = extract_snippet(content, 80)
+    if not fits(tweet):
+        snippet = extract_snippet(content, 80, sentences)
         tweet = template.format(
             snippet=snippet,
             author=post.get('author', 'An AI'),
@@ -99,7 +106,7 @@ def generate_tweet(post):
             url=post.get('url', 'https://moltbook.com')
         )
     
-    if len(tweet) > 280:
-        tweet = f"🦞 {snippet}\n\n{post.get('url', 'https://moltbook.com')}"
+    if not fits(tweet):
+        tweet = truncate_with_url(f"🦞 {snippet}", post.get('url', 'https://moltbook.com'), separator='\n\n')
     
-    return tweet[:280]
+    return tweet
@@ -0,0 +1,239 @@
+"""Storage backends for the posted-post history"""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from .storage import atomic_write_json, file_lock
+
+HistoryEntry = Dict
+
+
+class JsonHistoryStore:
+    """Posted history kept in memory and persisted as one JSON document
+
+    Simple and diff-friendly, but every write rewrites the whole file, so
+    it's only a good fit while the history stays small. With write_behind,
+    changes are buffered and written once by flush(); each flush re-reads
+    the file under an exclusive lock and merges into it, so overlapping runs
+    don't drop each other's entries.
+    """
+
+    def __init__(self, history_file, write_behind: bool = False):
+        self.history_file = Path(history_file)
+        self.write_behind = write_behind
+        self._pending = {}
+        self._trim_to = None
+        with file_lock(self.history_file, shared=True):
+            self.posted_posts = self._load_history()
+
+    def _load_history(self) -> dict:
+        """Load posted posts history"""
+        if self.history_file.exists():
+            try:
+                with open(self.history_file, 'r') as f:
+                    data = json.load(f)
+                    return data.get('posted_posts', {})
+            except Exception as e:
+                print(f"⚠️  Error loading history: {e}")
+
+        return {}
+
+    def _save_history(self):
+        """Save posted posts history"""
+        try:
+            data = {
+                'posted_posts': self.posted_posts,
+                'last_updated': datetime.now().isoformat()
+            }
+
+            atomic_write_json(self.history_file, data)
+
+        except Exception as e:
+            print(f"⚠️  Error saving history: {e}")
+
+    @staticmethod
+    def _most_recent(posted_posts: dict, keep_count: int) -> dict:
+        # Sort by posted_at date and keep only the most recent
+        sorted_posts = sorted(
+            posted_posts.items(),
+            key=lambda x: x[1].get('posted_at', ''),
+            reverse=True
+        )
+        return dict(sorted_posts[:keep_count])
+
+    def flush(self):
+        """Merge buffered changes into the file on disk"""
+        if not self._pending and self._trim_to is None:
+            return
+
+        with file_lock(self.history_file):
+            merged = self._load_history()
+            merged.update(self._pending)
+            if self._trim_to is not None and len(merged) > self._trim_to:
+                merged = self._most_recent(merged, self._trim_to)
+
+            self.posted_posts = merged
+            self._save_history()
+
+        self._pending = {}
+        self._trim_to = None
+
+    def __len__(self) -> int:
+        return len(self.posted_posts)
+
+    def contains(self, post_id: str) -> bool:
+        return post_id in self.posted_posts
+
+    def contains_many(self, post_ids: Iterable[str]) -> Set[str]:
+        return {post_id for post_id in post_ids if post_id in self.posted_posts}
+
+    def oldest_posted_at(self) -> Optional[str]:
+        """posted_at of the oldest entry still held (None if empty)"""
+        return min((e.get('posted_at', '') for e in self.posted_posts.values()), default=None)
+
+    def add_many(self, entries: Iterable[Tuple[str, HistoryEntry]]):
+        entries = dict(entries)
+        self.posted_posts.update(entries)
+        self._pending.update(entries)
+        if not self.write_behind:
+            self.flush()
+
+    def items(self) -> Iterator[Tuple[str, HistoryEntry]]:
+        return iter(list(self.posted_posts.items()))
+
+    def items_since(self, posted_at: str) -> Iterator[Tuple[str, HistoryEntry]]:
+        """Entries posted at or after an ISO timestamp"""
+        return iter([(k, e) for k, e in self.posted_posts.items() if e.get('posted_at', '') >= posted_at])
+
+    def trim(self, keep_count: int):
+        if len(self.posted_posts) > keep_count:
+            self.posted_posts = self._most_recent(self.posted_posts, keep_count)
+            self._trim_to = keep_count
+            if not self.write_behind:
+                self.flush()
+
+    def close(self):
+        self.flush()
+
+
+class SqliteHistoryStore:
+    """Posted history in SQLite with WAL journaling
+
+    Lookups hit the primary-key index on post_id, trimming uses the
+    posted_at index, and writes are single batched transactions, so neither
+    startup nor a write touches the whole history.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS posted_posts (
+            post_id TEXT PRIMARY KEY,
+            posted_at TEXT NOT NULL,
+            title TEXT NOT NULL DEFAULT '',
+            url TEXT NOT NULL DEFAULT '',
+            fingerprints TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_posted_posts_posted_at
+            ON posted_posts (posted_at);
+    """
+
+    def __init__(self, db_file, legacy_json_file=None):
+        self.db_file = Path(db_file)
+        self.conn = sqlite3.connect(self.db_file)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+        if legacy_json_file and len(self) == 0:
+            self._import_json(Path(legacy_json_file))
+
+    def _import_json(self, json_file: Path):
+        """One-off migration from a JsonHistoryStore file"""
+        if not json_file.exists():
+            return
+        legacy = JsonHistoryStore(json_file)
+        if len(legacy):
+            self.add_many(legacy.items())
+            print(f"✅ Imported {len(legacy)} posted entries from {json_file}")
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM posted_posts").fetchone()[0]
+
+    def contains(self, post_id: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM posted_posts WHERE post_id = ?", (post_id,)
+        ).fetchone()
+        return row is not None
+
+    def contains_many(self, post_ids: Iterable[str]) -> Set[str]:
+        # Pass the ids as one JSON array so any number of them is a single
+        # query without running into SQLite's bound-parameter limit
+        rows = self.conn.execute(
+            "SELECT post_id FROM posted_posts "
+            "WHERE post_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(post_ids)),)
+        )
+        return {row[0] for row in rows}
+
+    def oldest_posted_at(self) -> Optional[str]:
+        return self.conn.execute("SELECT MIN(posted_at) FROM posted_posts").fetchone()[0]
+
+    def add_many(self, entries: Iterable[Tuple[str, HistoryEntry]]):
+        rows = [
+            (
+                post_id,
+                entry.get('posted_at', datetime.now().isoformat()),
+                entry.get('title', ''),
+                entry.get('url', ''),
+                json.dumps(entry['fingerprints']) if entry.get('fingerprints') else None,
+            )
+            for post_id, entry in entries
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO posted_posts "
+                "(post_id, posted_at, title, url, fingerprints) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def items(self) -> Iterator[Tuple[str, HistoryEntry]]:
+        rows = self.conn.execute(
+            "SELECT post_id, posted_at, title, url, fingerprints FROM posted_posts"
+        )
+        return self._entries(rows)
+
+    def items_since(self, posted_at: str) -> Iterator[Tuple[str, HistoryEntry]]:
+        """Entries posted at or after an ISO timestamp (uses the posted_at index)"""
+        rows = self.conn.execute(
+            "SELECT post_id, posted_at, title, url, fingerprints FROM posted_posts "
+            "WHERE posted_at >= ?",
+            (posted_at,)
+        )
+        return self._entries(rows)
+
+    @staticmethod
+    def _entries(rows) -> Iterator[Tuple[str, HistoryEntry]]:
+        for post_id, posted_at, title, url, fingerprints in rows:
+            yield post_id, {
+                'posted_at': posted_at,
+                'title': title,
+                'url': url,
+                'fingerprints': json.loads(fingerprints) if fingerprints else None,
+            }
+
+    def trim(self, keep_count: int):
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM posted_posts WHERE post_id NOT IN ("
+                "SELECT post_id FROM posted_posts ORDER BY posted_at DESC LIMIT ?)",
+                (keep_count,)
+            )
+
+    def flush(self):
+        # Every add_many is already its own committed transaction
+        pass
+
+    def close(self):
+        self.conn.close()
@@ -1,6 +1,9 @@
 """Hybrid scraper that tries API first, falls back to browser scraping"""
 
+from typing import Callable, Dict, List, Optional
+
 from .api_scraper import scrape_moltbook_api
+from .crawl_planner import CrawlWatermarks
 from .scraper import scrape_moltbook as scrape_moltbook_browser
 
 
@@ -9,7 +12,10 @@ def scrape_moltbook_hybrid(
     include_agents: bool = False,
     visit_posts: bool = False,
     limit: int = 15,
-    sort: str = "top"
+    sort: str = "top",
+    needs_details: Optional[Callable[[Dict], bool]] = None,
+    author_store=None,
+    feeds: Optional[List[Dict]] = None
 ) -> dict:
     """Scrape Moltbook using API first, falling back to browser scraping
     
@@ -19,6 +25,12 @@ def scrape_moltbook_hybrid(
         visit_posts: If True, visit each post page for detailed data (browser only)
         limit: Number of posts to fetch
         sort: Sort order ("top" or "new")
+        needs_details: Optional check deciding which posts get a detail
+            fetch (API only)
+        author_store: Optional AuthorStore used to schedule agent profile
+            refreshes (API only)
+        feeds: Optional crawl plan (crawl_planner.plan_feeds()); the feeds
+            are fetched concurrently with per-feed watermarks (API only)
     
     Returns:
         Dict with keys 'posts', optionally 'stats' and 'agents'
@@ -29,7 +41,11 @@ def scrape_moltbook_hybrid(
             include_stats=include_stats,
             include_agents=include_agents,
             limit=limit,
-            sort=sort
+            sort=sort,
+            needs_details=needs_details,
+            author_store=author_store,
+            feeds=feeds,
+            watermarks=CrawlWatermarks() if feeds else None
         )
         
         if result.get('posts'):
@@ -57,10 +73,14 @@ def scrape_moltbook_hybrid(
 
 
 # For backward compatibility
-def scrape_moltbook(include_stats=False, include_agents=False, visit_posts=False):
+def scrape_moltbook(include_stats=False, include_agents=False, visit_posts=False, needs_details=None,
+                    feeds=None, author_store=None):
     """Legacy wrapper for hybrid scraper"""
     return scrape_moltbook_hybrid(
         include_stats=include_stats,
         include_agents=include_agents,
-        visit_posts=visit_posts
+        visit_posts=visit_posts,
+        needs_details=needs_details,
+        author_store=author_store,
+        feeds=feeds
     )
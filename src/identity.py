@@ -0,0 +1,196 @@
+"""Canonical post identity across the API and browser scrapers"""
+
+import hashlib
+import re
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+from .storage import atomic_write_json, file_lock, read_json
+
+_UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.I)
+_WORD_RE = re.compile(r'\w+')
+
+# Titles shorter than this are too generic to identify a post on their own
+MIN_TITLE_WORDS = 4
+# Leading content words hashed with the title; both scrapers see the same
+# text, while the browser scraper doesn't know authors or submolts
+CONTENT_PREFIX_WORDS = 12
+MIN_CONTENT_WORDS = 5
+
+
+def normalize_url(url: str) -> Optional[str]:
+    """Reduce a post URL to host + path so scheme, www and query don't matter"""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = parts.path.rstrip('/')
+    return f"{host}{path}" if host else None
+
+
+def extract_uuid(post: Dict) -> Optional[str]:
+    """The Moltbook UUID of a post, from its id or its URL"""
+    for value in (post.get('id', ''), post.get('url', '')):
+        match = _UUID_RE.search(value or '')
+        if match:
+            return match.group(0).lower()
+    return None
+
+
+def title_fingerprint(post: Dict) -> Optional[str]:
+    """Hash of the normalized title plus the start of the content
+
+    None when either is too short to tell posts apart (e.g. a browser
+    scrape that didn't open the post page), so such posts get no title key.
+    """
+    words = _WORD_RE.findall((post.get('title', '') or '').lower())
+    if len(words) < MIN_TITLE_WORDS:
+        return None
+    content_words = _WORD_RE.findall((post.get('content', '') or '').lower())[:CONTENT_PREFIX_WORDS]
+    if len(content_words) < MIN_CONTENT_WORDS:
+        return None
+    key = f"{' '.join(words)}\x00{' '.join(content_words)}"
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+
+def identity_keys(post: Dict) -> List[str]:
+    """Every key that can identify this post, strongest first"""
+    keys = []
+    uuid = extract_uuid(post)
+    if uuid:
+        keys.append(f"uuid:{uuid}")
+    url = normalize_url(post.get('url', ''))
+    if url:
+        keys.append(f"url:{url}")
+    title = title_fingerprint(post)
+    if title:
+        keys.append(f"title:{title}")
+    if post.get('id'):
+        keys.append(f"id:{post['id']}")
+    return keys
+
+
+def merge_post_records(existing: Dict, incoming: Dict) -> Dict:
+    """Merge two scrapes of the same post into one record
+
+    Engagement counts take the maximum, text fields keep the longer value,
+    and API-only fields (author_id, karma, created_at...) are kept from
+    whichever record has them.
+    """
+    merged = dict(existing)
+    for key, value in incoming.items():
+        current = merged.get(key)
+        if key in ('upvotes', 'comments', 'downvotes'):
+            merged[key] = max(current or 0, value or 0)
+        elif key in ('title', 'content'):
+            if len(value or '') > len(current or ''):
+                merged[key] = value
+        elif key == 'author':
+            if current in (None, '', 'Unknown'):
+                merged[key] = value
+        elif key in ('scraped_at', 'timestamp'):
+            merged[key] = max(current, value) if current else value
+        elif current in (None, '', 0, [], {}):
+            merged[key] = value
+    return merged
+
+
+class CanonicalIdIndex:
+    def __init__(self, index_file="data/canonical_ids.json", max_age_days: int = 90):
+        """Initialize the alias -> canonical id index
+
+        Aliases are UUIDs, normalized URLs, title fingerprints and the raw
+        ids each scraper produced. A post gets the Moltbook UUID as its
+        canonical id when one is known, else the id it was first seen with.
+        Aliases not seen for `max_age_days` (the archive's cold retention)
+        are dropped on save.
+        """
+        self.index_file = Path(index_file)
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age_days = max_age_days
+        with file_lock(self.index_file, shared=True):
+            self.aliases: Dict[str, str] = read_json(self.index_file, {}).get('aliases', {})
+        self._pending: Dict[str, str] = {}
+        self._seen: Set[str] = set()
+
+    def resolve(self, post: Dict) -> str:
+        """Return the canonical id for a post and remember its new aliases
+
+        A post with a UUID only follows an alias that leads to that same
+        UUID, so two distinct Moltbook posts never merge through a shared
+        title or URL. Existing aliases are never rewritten.
+        """
+        keys = identity_keys(post)
+        uuid = extract_uuid(post)
+        canonical = next((self.aliases[k] for k in keys if self._usable(k, uuid)), None)
+        if canonical is None:
+            canonical = uuid or post.get('id') or keys[0]
+
+        for key in keys:
+            self._seen.add(key)
+            if key not in self.aliases:
+                self.aliases[key] = canonical
+                self._pending[key] = canonical
+        return canonical
+
+    def _usable(self, key: str, uuid: Optional[str]) -> bool:
+        """Whether an existing alias may decide the canonical id of a post with this UUID"""
+        target = self.aliases.get(key)
+        if target is None:
+            return False
+        return uuid is None or key == f"uuid:{uuid}" or extract_uuid({'id': target}) == uuid
+
+    def merge(self, posts: List[Dict]) -> List[Dict]:
+        """Give posts canonical ids and merge records that are the same post
+
+        Each merged record lists the scraper ids it was seen under in
+        'source_ids', so history keyed by an old id still matches.
+        """
+        merged: Dict[str, Dict] = {}
+        for post in posts:
+            canonical = self.resolve(post)
+            source_ids = set(post.get('source_ids', []))
+            if post.get('id'):
+                source_ids.add(post['id'])
+
+            if canonical in merged:
+                record = merge_post_records(merged[canonical], post)
+                source_ids.update(merged[canonical].get('source_ids', []))
+            else:
+                record = dict(post)
+
+            record['id'] = canonical
+            record['source_ids'] = sorted(source_ids - {canonical})
+            merged[canonical] = record
+        return list(merged.values())
+
+    def save(self):
+        """Merge new aliases into the index file and prune stale ones"""
+        if not self._pending and not self._seen:
+            return
+        today = date.today()
+        cutoff = (today - timedelta(days=self.max_age_days)).isoformat()
+        try:
+            with file_lock(self.index_file):
+                data = read_json(self.index_file, {})
+                aliases = data.get('aliases', {})
+                # Aliases from before last_seen was tracked start aging now
+                last_seen = {key: data.get('last_seen', {}).get(key, today.isoformat()) for key in aliases}
+                aliases.update(self._pending)
+                last_seen.update((key, today.isoformat()) for key in self._seen | set(self._pending))
+
+                stale = [key for key, seen in last_seen.items() if seen < cutoff]
+                for key in stale:
+                    aliases.pop(key, None)
+                    del last_seen[key]
+
+                atomic_write_json(self.index_file, {'aliases': aliases, 'last_seen': last_seen}, indent=None)
+            self.aliases = aliases
+            self._pending = {}
+            self._seen = set()
+        except Exception as e:
+            print(f"⚠️  Error saving canonical id index: {e}")
@@ -1,12 +1,13 @@
 """Custom image generator for Moltbook posts with title overlay"""
 
 import os
-import re
-from typing import Optional, Tuple
+from typing import Iterable, Optional, Tuple
 
 import requests
 from PIL import Image, ImageDraw, ImageFont
 
+from .text_features import title_highlights, title_words
+
 
 class MoltbookImageGenerator:
     def __init__(self):
@@ -55,12 +56,15 @@ class MoltbookImageGenerator:
                 print("❌ No font available")
                 self.font = None
     
-    def generate_custom_image(self, title: str, output_path: Optional[str] = None) -> Optional[str]:
+    def generate_custom_image(self, title: str, output_path: Optional[str] = None,
+                              highlights: Optional[Iterable[str]] = None) -> Optional[str]:
         """Generate a custom image with title overlay
         
         Args:
             title: The post title to overlay
             output_path: Optional custom output path
+            highlights: Title words to color green, e.g. from the post's
+                text features; computed from the title if not given
             
         Returns:
             Path to the generated image or None if failed
@@ -77,11 +81,12 @@ class MoltbookImageGenerator:
             
             # Prepare the title text
             lines = self._prepare_title_lines(title)
+            highlights = set(title_highlights(title) if highlights is None else highlights)
             
             # Draw each line
             y_offset = 0
             for line in lines:
-                self._draw_text_line(draw, line, self.container_x, self.container_y + y_offset)
+                self._draw_text_line(draw, line, self.container_x, self.container_y + y_offset, highlights)
                 y_offset += 35  # Line spacing
             
             # Save the image
@@ -121,11 +126,9 @@ class MoltbookImageGenerator:
     
     def _prepare_title_lines(self, title: str) -> list:
         """Prepare title text for display (max 2 lines)"""
-        # Clean the title and convert to lowercase
-        title = re.sub(r'[^\w\s\-.,!?\'"]', '', title).lower()
-        
-        # Split into words
-        words = title.split()
+        # Clean the title, convert to lowercase and split into words
+        words = title_words(title)
+        title = ' '.join(words)
         
         lines = []
         current_line = ""
@@ -198,16 +201,11 @@ class MoltbookImageGenerator:
         
         return lines[:2]  # Ensure max 2 lines
     
-    def _draw_text_line(self, draw: ImageDraw.ImageDraw, text: str, x: int, y: int):
-        """Draw a line of text with colored keywords"""
-        # Identify important words to color green
-        important_words = [
-            'attack', 'security', 'vulnerability', 'breach', 'hack',
-            'AI', 'agent', 'conscious', 'doubt', 'exist', 'meaning',
-            'secret', 'hidden', 'shadow', 'mystery', 'truth',
-            'scary', 'terrifying', 'shocking', 'disturbing',
-            'build', 'create', 'ship', 'nightly', 'future'
-        ]
+    def _draw_text_line(self, draw: ImageDraw.ImageDraw, text: str, x: int, y: int,
+                        highlights: Optional[set] = None):
+        """Draw a line of text with the highlighted words colored"""
+        if highlights is None:
+            highlights = set(title_highlights(text))
         
         # Split text into parts preserving spaces
         parts = []
@@ -239,7 +237,7 @@ class MoltbookImageGenerator:
             
             # Determine color
             part_lower = part.lower().strip('.,!?')
-            color = self.green_color if any(imp in part_lower for imp in important_words) else self.gray_color
+            color = self.green_color if part_lower in highlights else self.gray_color
             
             # Draw the text
             if self.font:
@@ -265,7 +263,8 @@ def get_image_generator() -> MoltbookImageGenerator:
     return _image_generator
 
 
-def generate_custom_image(title: str, output_path: Optional[str] = None) -> Optional[str]:
+def generate_custom_image(title: str, output_path: Optional[str] = None,
+                          highlights: Optional[Iterable[str]] = None) -> Optional[str]:
     """Generate a custom image with title overlay"""
     generator = get_image_generator()
-    return generator.generate_custom_image(title, output_path)
+    return generator.generate_custom_image(title, output_path, highlights)
@@ -0,0 +1,159 @@
+"""Ingest stage between the scrapers and ranking"""
+
+import atexit
+import hashlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .authors import AuthorStore, get_author_store
+from .identity import CanonicalIdIndex, merge_post_records
+from .storage import atomic_write_json, file_lock, read_json
+from .text_features import annotate_posts
+
+
+def post_fingerprint(post: Dict) -> str:
+    """Fingerprint of everything that makes a post count as changed
+
+    Covers the title, a hash of the content, upvotes and comment count.
+    Cached text features are keyed separately, on the text alone.
+    """
+    content_hash = hashlib.sha1((post.get('content', '') or '').encode('utf-8')).hexdigest()
+    key = '\x00'.join([
+        post.get('title', '') or '',
+        content_hash,
+        str(post.get('upvotes', 0)),
+        str(post.get('comments', 0)),
+    ])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class FingerprintStore:
+    def __init__(self, store_file="data/ingest_fingerprints.json", max_age_days: int = 14):
+        """Initialize the store of per-post fingerprints from earlier runs
+
+        For every post seen it keeps the last fingerprint, comment count and
+        text features (including the ranker's content score), so a run only
+        re-scores posts whose text changed and re-fetches details for posts
+        with new comments. Entries not seen for `max_age_days` are dropped
+        on save.
+        """
+        self.store_file = Path(store_file)
+        self.max_age_days = max_age_days
+        with file_lock(self.store_file, shared=True):
+            self.entries: Dict[str, Dict] = read_json(self.store_file, {})
+        self._tracked: Dict[str, Dict] = {}
+
+    def needs_details(self, post: Dict) -> bool:
+        """Whether a detail fetch (comments) could return anything new"""
+        entry = self.entries.get(post.get('id'))
+        return entry is None or entry.get('comments') != post.get('comments')
+
+    def observe(self, post: Dict) -> bool:
+        """Fingerprint a post and attach its cached text features
+
+        The features are only used while their own key still matches the
+        post's text (see text_features), whatever happened to engagement.
+
+        Returns:
+            True if the post is new or changed since it was last seen
+        """
+        fingerprint = post_fingerprint(post)
+        post['fingerprint'] = fingerprint
+
+        entry = self.entries.get(post['id'])
+        changed = entry is None or entry.get('fingerprint') != fingerprint
+        if entry and entry.get('text_features') and 'text_features' not in post:
+            post['text_features'] = entry['text_features']
+
+        # Keep a reference so scores computed later in the run get saved too
+        self._tracked[post['id']] = post
+        return changed
+
+    def save(self):
+        """Merge this run's fingerprints into the store file"""
+        if not self._tracked:
+            return
+
+        now = datetime.now()
+        cutoff = (now - timedelta(days=self.max_age_days)).isoformat()
+        try:
+            with file_lock(self.store_file):
+                entries = read_json(self.store_file, {})
+                for post_id, post in self._tracked.items():
+                    entries[post_id] = {
+                        'fingerprint': post.get('fingerprint'),
+                        'comments': post.get('comments', 0),
+                        'text_features': post.get('text_features'),
+                        'seen_at': now.isoformat(),
+                    }
+                entries = {k: v for k, v in entries.items() if v.get('seen_at', '') >= cutoff}
+                atomic_write_json(self.store_file, entries, indent=None)
+            self.entries = entries
+            self._tracked = {}
+        except Exception as e:
+            print(f"⚠️  Error saving ingest fingerprints: {e}")
+
+
+def ingest_posts(posts: List[Dict], identity_index: Optional[CanonicalIdIndex] = None,
+                 lookup: Optional[Callable[[str], Optional[Dict]]] = None,
+                 fingerprints: Optional[FingerprintStore] = None,
+                 authors: Optional[AuthorStore] = None) -> List[Dict]:
+    """Turn raw scraper output into one canonical record per post
+
+    Args:
+        posts: Posts from any scraper
+        identity_index: Index mapping URLs, UUIDs and titles to canonical ids
+        lookup: Optional id -> stored record function (e.g. PostArchive.get);
+            stored records are merged in so a thinner scrape never
+            overwrites richer data from another source
+        fingerprints: Store used to detect unchanged posts
+        authors: Author table updated from the posts' inline author data
+
+    Returns:
+        Canonical post records, each scored, generated and stored once,
+        carrying their precomputed text features
+    """
+    identity_index = identity_index or get_identity_index()
+    fingerprints = fingerprints or get_fingerprint_store()
+    if authors is None:
+        authors = get_author_store()
+    merged = identity_index.merge(posts)
+    identity_index.save()
+
+    result = []
+    for post in merged:
+        stored = lookup(post['id']) if lookup else None
+        if stored is not None:
+            record = merge_post_records(stored, post)
+            record['source_ids'] = sorted(set(stored.get('source_ids', [])) | set(post['source_ids']))
+            post = record
+        result.append(post)
+
+    changed = sum(fingerprints.observe(post) for post in result)
+    annotate_posts(result)
+    authors.observe_posts(result)
+    print(f"🔎 Ingested {len(result)} posts, {changed} new or changed")
+    return result
+
+
+# Global instances
+_identity_index = None
+_fingerprint_store = None
+
+
+def get_identity_index() -> CanonicalIdIndex:
+    """Get or create the global canonical id index"""
+    global _identity_index
+    if _identity_index is None:
+        _identity_index = CanonicalIdIndex()
+    return _identity_index
+
+
+def get_fingerprint_store() -> FingerprintStore:
+    """Get or create the global fingerprint store, saved when the process exits"""
+    global _fingerprint_store
+    if _fingerprint_store is None:
+        _fingerprint_store = FingerprintStore()
+        atexit.register(_fingerprint_store.save)
+    return _fingerprint_store
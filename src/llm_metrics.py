@@ -0,0 +1,192 @@
+"""Token, latency and cost accounting for LLM calls
+
+Every generation request (one post, all of its attempts) becomes one JSONL
+record in data/llm_metrics.jsonl. Aggregates can be taken for the current
+run or over a rolling window:
+
+    python -m src.llm_metrics --days 7
+
+The log is rotated to data/llm_metrics.jsonl.1 once it passes
+LLM_METRICS_MAX_BYTES, so a rolling summary never reads more than two
+generations.
+"""
+
+import argparse
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+# USD per million tokens: input, output, cache write, cache read
+MODEL_PRICES = {
+    'claude-3-haiku-20240307': {'input': 0.25, 'output': 1.25, 'cache_write': 0.30, 'cache_read': 0.03},
+}
+
+# Past this size the log is rotated to <log>.1, replacing the previous one
+# (~2,500 calls, far more than a week of runs)
+LLM_METRICS_MAX_BYTES = 1024 * 1024
+
+TOKEN_FIELDS = ['input_tokens', 'output_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens']
+
+
+def usage_to_dict(usage, streamed_chars: Optional[int] = None) -> Dict:
+    """Token counts from an Anthropic Usage object
+
+    Streams that were stopped early never receive the final output token
+    count; it is then estimated from the characters received (~4 per token).
+    """
+    counts = {field: getattr(usage, field, 0) or 0 for field in TOKEN_FIELDS} if usage else {
+        field: 0 for field in TOKEN_FIELDS
+    }
+    if streamed_chars is not None and counts['output_tokens'] <= 1:
+        counts['output_tokens'] = max(1, streamed_chars // 4)
+        counts['output_tokens_estimated'] = True
+    return counts
+
+
+def estimate_cost(record: Dict) -> Optional[float]:
+    prices = MODEL_PRICES.get(record.get('model'))
+    if prices is None:
+        return None
+    return (
+        record.get('input_tokens', 0) * prices['input']
+        + record.get('output_tokens', 0) * prices['output']
+        + record.get('cache_creation_input_tokens', 0) * prices['cache_write']
+        + record.get('cache_read_input_tokens', 0) * prices['cache_read']
+    ) / 1_000_000
+
+
+def summarize(records: Iterable[Dict]) -> Dict:
+    """Aggregate call records: counts by outcome, tokens, latency and cost"""
+    records = list(records)
+    summary = {'calls': len(records), 'outcomes': {}, 'fallback_reasons': {}}
+    for field in TOKEN_FIELDS:
+        summary[field] = sum(r.get(field, 0) for r in records)
+    for r in records:
+        summary['outcomes'][r['outcome']] = summary['outcomes'].get(r['outcome'], 0) + 1
+        if r.get('fallback_reason'):
+            reason = r['fallback_reason'].split(':', 1)[0]
+            summary['fallback_reasons'][reason] = summary['fallback_reasons'].get(reason, 0) + 1
+
+    api_calls = [r for r in records if r.get('attempts')]
+    walls = sorted(r['wall_seconds'] for r in api_calls)
+    summary['attempts'] = sum(r['attempts'] for r in api_calls)
+    summary['mean_wall_seconds'] = round(sum(walls) / len(walls), 3) if walls else None
+    summary['p95_wall_seconds'] = round(walls[min(len(walls) - 1, int(len(walls) * 0.95))], 3) if walls else None
+
+    prompt_tokens = summary['input_tokens'] + summary['cache_creation_input_tokens'] + summary['cache_read_input_tokens']
+    summary['cache_read_ratio'] = round(summary['cache_read_input_tokens'] / prompt_tokens, 3) if prompt_tokens else None
+    costs = [c for c in (estimate_cost(r) for r in records) if c is not None]
+    summary['estimated_cost_usd'] = round(sum(costs), 6)
+    return summary
+
+
+class LlmMetrics:
+    def __init__(self, log_file="data/llm_metrics.jsonl", run_id: Optional[str] = None,
+                 max_bytes: int = LLM_METRICS_MAX_BYTES):
+        """Initialize the metrics log for this run
+
+        The log is rotated once it grows past max_bytes, so at most one older
+        generation (<log_file>.1) is kept.
+        """
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.run_id = run_id or f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self.records: List[Dict] = []
+
+    def start_call(self, post: Dict, mode: str, model: str) -> Dict:
+        """Begin a call record; `mode` is e.g. "message", "async" or "batch" """
+        return {
+            'run_id': self.run_id,
+            'post_id': post.get('id', post.get('url', '')),
+            'mode': mode,
+            'model': model,
+            'attempts': 0,
+            **{field: 0 for field in TOKEN_FIELDS},
+            '_started': time.monotonic(),
+        }
+
+    @staticmethod
+    def add_usage(call: Dict, usage: Dict):
+        """Add one response's token counts to a call (summed across attempts)"""
+        for field in TOKEN_FIELDS:
+            call[field] += usage.get(field, 0)
+        if usage.get('output_tokens_estimated'):
+            call['output_tokens_estimated'] = True
+
+    def finish_call(self, call: Dict, outcome: str, fallback_reason: Optional[str] = None):
+        """Complete a call record and append it to the log
+
+        Args:
+            outcome: "generated", "cached", "fallback" or "failed"
+            fallback_reason: Why Claude's answer wasn't used, if it wasn't
+        """
+        record = {k: v for k, v in call.items() if not k.startswith('_')}
+        record['logged_at'] = datetime.now().isoformat()
+        record['wall_seconds'] = round(time.monotonic() - call['_started'], 3)
+        record['outcome'] = outcome
+        record['fallback_reason'] = fallback_reason
+        record['estimated_cost_usd'] = estimate_cost(record)
+        self.records.append(record)
+
+        try:
+            os.makedirs(os.path.dirname(self.log_file) or '.', exist_ok=True)
+            if os.path.exists(self.log_file) and os.path.getsize(self.log_file) > self.max_bytes:
+                os.replace(self.log_file, self.log_file + '.1')
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except Exception as e:
+            print(f"⚠️  Error writing LLM metrics: {e}")
+
+    def run_summary(self) -> Dict:
+        return summarize(self.records)
+
+    def rolling_summary(self, days: int = 7) -> Dict:
+        """Aggregate over every logged call from the last `days` days
+
+        Reads the current log and the rotated generation before it.
+        """
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        records = []
+        for path in (self.log_file + '.1', self.log_file):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        if record.get('logged_at', '') >= cutoff:
+                            records.append(record)
+            except FileNotFoundError:
+                pass
+        summary = summarize(records)
+        summary['days'] = days
+        summary['runs'] = len({r.get('run_id') for r in records})
+        return summary
+
+
+# Global instance
+_llm_metrics = None
+
+
+def get_llm_metrics() -> LlmMetrics:
+    """Get or create the global metrics log for this run"""
+    global _llm_metrics
+    if _llm_metrics is None:
+        _llm_metrics = LlmMetrics()
+    return _llm_metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize logged LLM calls")
+    parser.add_argument('--days', type=int, default=7, help='Rolling window in days')
+    parser.add_argument('--log-file', default="data/llm_metrics.jsonl")
+    args = parser.parse_args()
+    print(json.dumps(LlmMetrics(args.log_file).rolling_summary(args.days), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""Day-partitioned post archive with tiered retention"""
+
+import gzip
+import json
+import os
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .post_log import PostLog
+from .storage import atomic_write_bytes, file_lock
+
+_PARTITION_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})\.jsonl(\.gz)?$')
+
+
+class PostArchive:
+    """Post storage split into one partition per day a post was first seen
+
+    Partitions move through three tiers as they age:
+
+    - hot: the last `hot_days` days, plain JSONL, loaded for ranking
+    - warm: up to `warm_days` old, plain JSONL, kept on disk but never loaded
+    - cold: up to `cold_days` old, compacted and gzipped; deleted afterwards
+
+    Only hot partitions are read on a normal run, so memory use and load
+    time stay flat however long the bot has been running. The flip side is
+    that a post scraped again after its partition left the hot tier starts
+    a new first-seen day: it lands in today's partition as a new post, and
+    the older partition keeps its earlier version until retention drops it.
+    """
+
+    def __init__(self, archive_dir="data/posts", hot_days: int = 2, warm_days: int = 14,
+                 cold_days: int = 90):
+        if not 0 < hot_days <= warm_days <= cold_days:
+            raise ValueError("Retention must satisfy 0 < hot_days <= warm_days <= cold_days")
+
+        self.archive_dir = Path(archive_dir)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.hot_days = hot_days
+        self.warm_days = warm_days
+        self.cold_days = cold_days
+
+        self._logs: Dict[date, PostLog] = {}
+        self._hot_index: Optional[Dict[str, date]] = None
+
+    def _partitions(self) -> Dict[date, Path]:
+        """Map each partition day to its file"""
+        partitions = {}
+        for entry in os.scandir(self.archive_dir):
+            match = _PARTITION_RE.match(entry.name)
+            if match:
+                partitions[date.fromisoformat(match.group(1))] = Path(entry.path)
+        return partitions
+
+    def _log(self, day: date) -> PostLog:
+        if day not in self._logs:
+            self._logs[day] = PostLog(self.archive_dir / f"{day.isoformat()}.jsonl")
+        return self._logs[day]
+
+    def _tier(self, day: date, today: date) -> str:
+        age = (today - day).days
+        if age < self.hot_days:
+            return 'hot'
+        if age < self.warm_days:
+            return 'warm'
+        if age < self.cold_days:
+            return 'cold'
+        return 'expired'
+
+    def _hot_days_list(self, today: Optional[date] = None) -> List[date]:
+        today = today or date.today()
+        return [
+            day for day, path in sorted(self._partitions().items())
+            if self._tier(day, today) == 'hot' and path.suffix == '.jsonl'
+        ]
+
+    @property
+    def hot_index(self) -> Dict[str, date]:
+        """post id -> hot partition holding its latest version"""
+        if self._hot_index is None:
+            index = {}
+            for day in self._hot_days_list():
+                for post_id in self._log(day).index:
+                    index[post_id] = day
+            self._hot_index = index
+        return self._hot_index
+
+    def hot_posts(self) -> List[Dict]:
+        """Latest version of every post in the hot tier"""
+        return [self._log(day).get(post_id) for post_id, day in self.hot_index.items()]
+
+    def get(self, post_id: str) -> Optional[Dict]:
+        day = self.hot_index.get(post_id)
+        return self._log(day).get(post_id) if day else None
+
+    def __len__(self) -> int:
+        return len(self.hot_index)
+
+    def __contains__(self, post_id: str) -> bool:
+        return post_id in self.hot_index
+
+    def _group_by_partition(self, posts: Iterable[Dict], default_day: date) -> Dict[date, List[Dict]]:
+        groups: Dict[date, List[Dict]] = {}
+        for post in posts:
+            day = self.hot_index.get(post['id'], default_day)
+            groups.setdefault(day, []).append(post)
+        return groups
+
+    def append(self, posts: Iterable[Dict]):
+        """Append new versions of posts to the partition that holds them"""
+        for day, group in self._group_by_partition(posts, date.today()).items():
+            self._log(day).append(group)
+            for post in group:
+                self.hot_index[post['id']] = day
+
+    def upsert(self, posts: Iterable[Dict]) -> int:
+        """Store new or changed posts; returns how many were new to the hot tier"""
+        new_count = 0
+        for day, group in self._group_by_partition(posts, date.today()).items():
+            new_count += self._log(day).upsert(group)
+            for post in group:
+                self.hot_index[post['id']] = day
+        return new_count
+
+    def import_posts(self, posts: Iterable[Dict]):
+        """Bulk-load posts into partitions by their scraped_at day"""
+        groups: Dict[date, List[Dict]] = {}
+        for post in posts:
+            try:
+                day = datetime.fromisoformat(post['scraped_at']).date()
+            except (KeyError, TypeError, ValueError):
+                day = date.today()
+            groups.setdefault(day, []).append(post)
+
+        for day, group in groups.items():
+            self._log(day).append(group)
+        self._hot_index = None
+
+    def iter_posts(self, tiers=('hot', 'warm', 'cold')) -> Iterator[Dict]:
+        """Stream posts from the given tiers, newest partition first
+
+        A post stored in several partitions (re-scraped after leaving the
+        hot tier) is yielded once, in its newest version.
+        """
+        today = date.today()
+        seen = set()
+        for day, path in sorted(self._partitions().items(), reverse=True):
+            if self._tier(day, today) not in tiers:
+                continue
+            if path.suffix == '.gz':
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    posts = (json.loads(line) for line in f if line.strip())
+                    yield from self._unseen(posts, seen)
+            else:
+                yield from self._unseen(self._log(day).posts(), seen)
+
+    @staticmethod
+    def _unseen(posts: Iterable[Dict], seen: set) -> Iterator[Dict]:
+        for post in posts:
+            if post['id'] not in seen:
+                seen.add(post['id'])
+                yield post
+
+    def apply_retention(self, today: Optional[date] = None):
+        """Compress partitions that reached the cold tier and drop expired ones"""
+        today = today or date.today()
+        compressed = deleted = 0
+
+        for day, path in sorted(self._partitions().items()):
+            tier = self._tier(day, today)
+
+            if tier == 'expired':
+                with file_lock(path):
+                    path.unlink()
+                self._logs.pop(day, None)
+                deleted += 1
+
+            elif tier == 'cold' and path.suffix == '.jsonl':
+                log = self._log(day)
+                log.close()
+                with file_lock(path):
+                    # Compact while compressing: only the latest version survives
+                    latest = log.read_latest()
+                    data = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in latest.values())
+                    atomic_write_bytes(path.with_name(path.name + '.gz'), gzip.compress(data.encode('utf-8')))
+                    path.unlink()
+                self._logs.pop(day, None)
+                compressed += 1
+
+        if compressed or deleted:
+            print(f"🗄️  Retention: compressed {compressed} partition(s), deleted {deleted}")
+            self._hot_index = None
+
+    def close(self):
+        for log in self._logs.values():
+            log.close()
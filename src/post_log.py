@@ -0,0 +1,180 @@
+"""Append-only JSONL store for scraped posts"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .storage import atomic_write_bytes, file_lock
+
+
+class PostLog:
+    """Log-structured post database
+
+    Every new or updated post is appended as one JSON line; the latest line
+    for an id wins. The id index is only built when something needs it, and
+    the log is compacted (rewritten with one line per post) in a background
+    thread once superseded lines dominate it. A run therefore writes only
+    the posts it scraped instead of rewriting the whole archive.
+    """
+
+    def __init__(self, log_file="data/posts.jsonl", compact_ratio: float = 2.0,
+                 compact_min_lines: int = 1000):
+        """Initialize the post log
+
+        Args:
+            log_file: Path of the JSONL log
+            compact_ratio: Compact once lines exceed this multiple of live posts
+            compact_min_lines: Never compact logs shorter than this
+        """
+        self.log_file = Path(log_file)
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self.compact_ratio = compact_ratio
+        self.compact_min_lines = compact_min_lines
+
+        self._index: Optional[Dict[str, Dict]] = None
+        self._line_count = 0
+        self._compaction: Optional[threading.Thread] = None
+        self._count_lock = threading.Lock()
+
+    def _read_log(self):
+        """Yield records from the log, skipping a torn trailing line"""
+        if not self.log_file.exists():
+            return
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"⚠️  Skipping corrupt line in {self.log_file}")
+
+    def read_latest(self) -> Dict[str, Dict]:
+        """Read the log from disk and return id -> latest record"""
+        latest = {}
+        for record in self._read_log():
+            latest[record['id']] = record
+        return latest
+
+    @property
+    def index(self) -> Dict[str, Dict]:
+        """id -> latest record, built on first use"""
+        if self._index is None:
+            index = {}
+            line_count = 0
+            with file_lock(self.log_file, shared=True):
+                for record in self._read_log():
+                    index[record['id']] = record
+                    line_count += 1
+            self._index = index
+            self._line_count = line_count
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, post_id: str) -> bool:
+        return post_id in self.index
+
+    def get(self, post_id: str) -> Optional[Dict]:
+        return self.index.get(post_id)
+
+    def posts(self) -> List[Dict]:
+        """All live posts"""
+        return list(self.index.values())
+
+    def append(self, posts: Iterable[Dict]):
+        """Append posts to the log as new versions"""
+        posts = list(posts)
+        lines = [json.dumps(post, ensure_ascii=False) + '\n' for post in posts]
+        if not lines:
+            return
+
+        with file_lock(self.log_file):
+            if not self._ends_with_newline():
+                # A torn line from an interrupted append: terminate it so it
+                # stays a single skipped line instead of swallowing ours
+                lines[0] = '\n' + lines[0]
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+
+        if self._index is not None:
+            for post in posts:
+                self._index[post['id']] = post
+            with self._count_lock:
+                self._line_count += len(lines)
+
+        self.maybe_compact()
+
+    def _ends_with_newline(self) -> bool:
+        """Whether the log is empty or its last line is complete"""
+        try:
+            with open(self.log_file, 'rb') as f:
+                f.seek(0, 2)
+                if f.tell() == 0:
+                    return True
+                f.seek(-1, 2)
+                return f.read(1) == b'\n'
+        except FileNotFoundError:
+            return True
+
+    def upsert(self, posts: Iterable[Dict]) -> int:
+        """Append posts that are new or changed; returns how many were new"""
+        changed = []
+        new_count = 0
+        for post in posts:
+            existing = self.index.get(post['id'])
+            if existing is None:
+                new_count += 1
+                changed.append(post)
+            elif existing != post:
+                changed.append(post)
+
+        self.append(changed)
+        return new_count
+
+    def needs_compaction(self) -> bool:
+        live = len(self.index)
+        return (self._line_count >= self.compact_min_lines
+                and self._line_count > live * self.compact_ratio)
+
+    def maybe_compact(self, background: bool = True):
+        """Start a compaction if superseded lines dominate the log"""
+        if self._index is None or not self.needs_compaction():
+            return
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+
+        if background:
+            self._compaction = threading.Thread(target=self.compact, name='post-log-compaction')
+            self._compaction.start()
+        else:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log with only the latest version of each post"""
+        try:
+            with file_lock(self.log_file):
+                # Re-read under the lock so appends from other runs are kept
+                latest = {}
+                lines_read = 0
+                for record in self._read_log():
+                    latest[record['id']] = record
+                    lines_read += 1
+                data = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in latest.values())
+                atomic_write_bytes(self.log_file, data.encode('utf-8'))
+
+            if self._index is not None:
+                with self._count_lock:
+                    self._line_count -= lines_read - len(latest)
+            print(f"🗜️  Compacted {self.log_file}: {lines_read} → {len(latest)} lines")
+        except Exception as e:
+            print(f"⚠️  Error compacting post log: {e}")
+
+    def close(self):
+        """Wait for a running compaction to finish"""
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
@@ -0,0 +1,191 @@
+"""Persistent posting queue for batches of tweets and threads
+
+Items are published in order from one browser session. Each item's status
+is saved as soon as it changes, so a failed run resumes where it stopped;
+thread replies chain to the tweet id of the item before them. Only errors
+raised before the tweet button was clicked are retried; an item that fails
+after it is marked failed, since the tweet may have been posted.
+
+Usage:
+    python -m src.post_queue status
+    python -m src.post_queue publish      # uses TWITTER_COOKIES
+"""
+
+import os
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from .storage import atomic_write_json, file_lock, read_json
+
+PENDING = 'pending'
+POSTED = 'posted'
+FAILED = 'failed'
+
+
+class PostQueue:
+    def __init__(self, queue_file="data/post_queue.json", max_attempts: int = 3):
+        """Initialize the queue
+
+        Items that fail `max_attempts` times are marked failed and, for
+        threads, block the replies after them.
+        """
+        self.queue_file = Path(queue_file)
+        self.max_attempts = max_attempts
+        with file_lock(self.queue_file, shared=True):
+            self.items: List[Dict] = read_json(self.queue_file, {}).get('items', [])
+        self._dirty: Set[str] = set()
+
+    def _save(self):
+        """Merge this queue's changed items into the file by item id
+
+        Items changed elsewhere (another enqueue or publish) are kept, and
+        self.items is refreshed from the merged file.
+        """
+        with file_lock(self.queue_file):
+            items = read_json(self.queue_file, {}).get('items', [])
+            known = {item['id'] for item in items}
+            mine = {item['id']: item for item in self.items if item['id'] in self._dirty}
+            items = [mine.get(item['id'], item) for item in items]
+            items.extend(item for item_id, item in mine.items() if item_id not in known)
+            atomic_write_json(self.queue_file, {'items': items})
+        self.items = items
+        self._dirty = set()
+
+    def _new_item(self, text: str, image_path: Optional[str], thread_id: Optional[str],
+                  position: int, post_id: Optional[str]) -> Dict:
+        return {
+            'id': uuid.uuid4().hex[:12],
+            'text': text,
+            'image_path': image_path,
+            'thread_id': thread_id,
+            'position': position,
+            'post_id': post_id,
+            'status': PENDING,
+            'tweet_id': None,
+            'attempts': 0,
+            'error': None,
+            'updated_at': datetime.now().isoformat(),
+        }
+
+    def enqueue(self, text: str, image_path: Optional[str] = None, post_id: Optional[str] = None) -> str:
+        """Queue a single tweet and return its item id"""
+        item = self._new_item(text, image_path, None, 0, post_id)
+        self.items.append(item)
+        self._dirty.add(item['id'])
+        self._save()
+        return item['id']
+
+    def enqueue_thread(self, tweets: List[str], image_path: Optional[str] = None,
+                       post_id: Optional[str] = None) -> str:
+        """Queue a thread (e.g. from generate_thread_tweets) and return its id
+
+        The image, if any, is attached to the first tweet.
+        """
+        thread_id = uuid.uuid4().hex[:12]
+        for position, text in enumerate(tweets):
+            item = self._new_item(text, image_path if position == 0 else None, thread_id, position, post_id)
+            self.items.append(item)
+            self._dirty.add(item['id'])
+        self._save()
+        return thread_id
+
+    def _reply_target(self, item: Dict) -> Optional[str]:
+        """Tweet id this item replies to; raises if the previous item isn't posted"""
+        if item['thread_id'] is None or item['position'] == 0:
+            return None
+        previous = next(
+            i for i in self.items
+            if i['thread_id'] == item['thread_id'] and i['position'] == item['position'] - 1
+        )
+        if previous['status'] != POSTED or not previous['tweet_id']:
+            raise LookupError("previous thread item is not posted")
+        return previous['tweet_id']
+
+    def pending(self) -> List[Dict]:
+        return [i for i in self.items if i['status'] == PENDING]
+
+    def publish(self, cookies_json=None) -> Dict[str, int]:
+        """Post all pending items in one browser session
+
+        Returns:
+            Counts of items posted, failed and still pending
+        """
+        # Playwright is only needed to publish, not to queue or inspect
+        from .poster import TweetSubmitError, publish_tweet, twitter_session
+
+        if not self.pending():
+            print("ℹ️  Post queue is empty")
+            return self.summary()
+
+        blocked_threads = set()
+        try:
+            with twitter_session(cookies_json) as page:
+                for item_id in [i['id'] for i in self.pending()]:
+                    # Re-read after every save, another run may have posted it
+                    item = next((i for i in self.items if i['id'] == item_id), None)
+                    if item is None or item['status'] != PENDING or item['thread_id'] in blocked_threads:
+                        continue
+                    try:
+                        reply_to = self._reply_target(item)
+                    except LookupError:
+                        blocked_threads.add(item['thread_id'])
+                        continue
+
+                    item['attempts'] += 1
+                    try:
+                        item['tweet_id'] = publish_tweet(page, item['text'], item['image_path'], reply_to)
+                        item['status'] = POSTED
+                        item['error'] = None
+                        print(f"✅ Posted queue item {item['id']}")
+                    except TweetSubmitError as e:
+                        # The tweet may be live; retrying could post it twice
+                        item['error'] = f"after submit, check before requeueing: {e}"
+                        item['status'] = FAILED
+                        print(f"❌ Queue item {item['id']} failed after submit, not retrying: {e}")
+                        if item['thread_id'] is not None:
+                            blocked_threads.add(item['thread_id'])
+                    except Exception as e:
+                        item['error'] = str(e)
+                        if item['attempts'] >= self.max_attempts:
+                            item['status'] = FAILED
+                        print(f"❌ Error posting queue item {item['id']}: {e}")
+                        if item['thread_id'] is not None:
+                            blocked_threads.add(item['thread_id'])
+
+                    item['updated_at'] = datetime.now().isoformat()
+                    self._dirty.add(item['id'])
+                    self._save()
+        except Exception as e:
+            print(f"❌ Error opening Twitter session: {e}")
+
+        return self.summary()
+
+    def summary(self) -> Dict[str, int]:
+        counts = {PENDING: 0, POSTED: 0, FAILED: 0}
+        for item in self.items:
+            counts[item['status']] += 1
+        return counts
+
+
+def main():
+    queue = PostQueue()
+    action = sys.argv[1] if len(sys.argv) > 1 else 'status'
+
+    if action == 'publish':
+        cookies = os.getenv('TWITTER_COOKIES')
+        if not cookies:
+            print("❌ No Twitter cookies found in environment!")
+            sys.exit(1)
+        queue.publish(cookies)
+
+    for item in queue.items:
+        thread = f" thread {item['thread_id']}#{item['position'] + 1}" if item['thread_id'] else ''
+        print(f"{item['status']:>8} {item['id']}{thread}: {item['text'][:50]!r}")
+    print(queue.summary())
+
+
+if __name__ == '__main__':
+    main()
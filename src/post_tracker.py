@@ -1,80 +1,219 @@
 """Track posted posts to avoid duplicates"""
 
-import json
+import atexit
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Dict, Optional
+
+from .bloom import ScalableBloomFilter
+from .dedup import NearDuplicateIndex, post_fingerprints
+from .history_store import JsonHistoryStore, SqliteHistoryStore
+from .storage import file_lock
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+# Posts older than this are left out of the near-duplicate index; the
+# Bloom filter still catches an exact repost of them
+DEDUP_WINDOW_DAYS = 30
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """Local naive datetime for an ISO timestamp (API times are UTC with Z)"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
 
 
 class PostTracker:
-    def __init__(self, history_file="data/posted_history.json"):
-        """Initialize the post tracker"""
+    def __init__(self, history_file="data/posted_history.json", backend=None,
+                 bloom_error_rate=0.001, bloom_capacity=10000, write_behind=False):
+        """Initialize the post tracker
+
+        Every id ever posted goes into a persisted Bloom filter next to the
+        history file. Membership checks go through the filter first, so
+        trimming the detailed history never makes an old post look unposted.
+        Filter hits are confirmed against the history store whenever the
+        post is recent enough that trimming can't have removed it, so false
+        positives don't drop fresh candidates.
+
+        Args:
+            history_file: Where to keep the history
+            backend: "json" or "sqlite"; inferred from the file suffix if None.
+                A SQLite history imports the JSON history next to it on first use.
+            bloom_error_rate: Target false-positive rate of the posted-id filter
+            bloom_capacity: Initial filter capacity; it grows as needed
+            write_behind: Buffer changes in memory until flush() instead of
+                writing on every call
+        """
         self.history_file = Path(history_file)
         self.history_file.parent.mkdir(exist_ok=True)
-        self.posted_posts = self._load_history()
-    
-    def _load_history(self) -> dict:
-        """Load posted posts history"""
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, 'r') as f:
-                    data = json.load(f)
-                    return data.get('posted_posts', {})
-            except Exception as e:
-                print(f"⚠️  Error loading history: {e}")
-        
-        return {}
-    
-    def _save_history(self):
-        """Save posted posts history"""
+
+        if backend is None:
+            backend = 'sqlite' if self.history_file.suffix in SQLITE_SUFFIXES else 'json'
+
+        if backend == 'sqlite':
+            self.store = SqliteHistoryStore(
+                self.history_file,
+                legacy_json_file=self.history_file.with_suffix('.json')
+            )
+        elif backend == 'json':
+            self.store = JsonHistoryStore(self.history_file, write_behind=write_behind)
+        else:
+            raise ValueError(f"Unknown post tracker backend: {backend}")
+
+        self.write_behind = write_behind
+        self._pending_ids = []
+        self.bloom_file = self.history_file.with_suffix('.bloom')
+        self.bloom = self._load_bloom(bloom_capacity, bloom_error_rate)
+        if not write_behind:
+            self._flush_bloom()
+
+    def _load_bloom(self, capacity: int, error_rate: float) -> ScalableBloomFilter:
+        """Load the posted-id filter, rebuilding it from the history if missing"""
         try:
-            data = {
-                'posted_posts': self.posted_posts,
-                'last_updated': datetime.now().isoformat()
-            }
-            
-            with open(self.history_file, 'w') as f:
-                json.dump(data, f, indent=2)
-                
+            with file_lock(self.bloom_file, shared=True):
+                bloom = ScalableBloomFilter.load(self.bloom_file, capacity, error_rate)
+            if bloom is not None:
+                return bloom
         except Exception as e:
-            print(f"⚠️  Error saving history: {e}")
-    
-    def is_posted(self, post_id: str) -> bool:
+            print(f"⚠️  Error loading posted-id filter: {e}")
+
+        bloom = ScalableBloomFilter(capacity, error_rate)
+        for post_id, _ in self.store.items():
+            bloom.add(post_id)
+            self._pending_ids.append(post_id)
+        return bloom
+
+    def _flush_bloom(self):
+        """Merge pending ids into the filter on disk and save it"""
+        if not self._pending_ids:
+            return
+        try:
+            with file_lock(self.bloom_file):
+                on_disk = ScalableBloomFilter.load(
+                    self.bloom_file, self.bloom.initial_capacity, self.bloom.error_rate
+                )
+                if on_disk is not None:
+                    # Another run may have posted since we loaded
+                    for post_id in self._pending_ids:
+                        on_disk.add(post_id)
+                    self.bloom = on_disk
+                self.bloom.save(self.bloom_file)
+            self._pending_ids = []
+        except Exception as e:
+            print(f"⚠️  Error saving posted-id filter: {e}")
+
+    def is_posted(self, post_id: str, created_at: Optional[str] = None) -> bool:
         """Check if a post has been posted before"""
-        return post_id in self.posted_posts
-    
+        return bool(self.filter_posted([post_id], {post_id: created_at}))
+
+    def filter_posted(self, post_ids: list, created_at: Optional[Dict[str, Optional[str]]] = None) -> set:
+        """Return the subset of post_ids that have been posted
+
+        Args:
+            post_ids: Ids to check
+            created_at: Optional id -> post creation time. A filter hit for a
+                post created after the oldest retained history entry must be
+                in the store (it can't have been trimmed), so a miss there
+                is a false positive.
+        """
+        hits = [post_id for post_id in post_ids if post_id in self.bloom]
+        if not hits:
+            return set()
+
+        confirmed = self.store.contains_many(hits)
+        window_start = _parse_time(self.store.oldest_posted_at())
+        posted = set(confirmed)
+        for post_id in hits:
+            if post_id in confirmed:
+                continue
+            created = _parse_time((created_at or {}).get(post_id))
+            if created is None or window_start is None or created <= window_start:
+                # Possibly trimmed from the history: trust the filter
+                posted.add(post_id)
+        return posted
+
     def mark_posted(self, post_id: str, post_data: dict):
         """Mark a post as posted"""
-        self.posted_posts[post_id] = {
-            'posted_at': datetime.now().isoformat(),
-            'title': post_data.get('title', ''),
-            'url': post_data.get('url', '')
-        }
-        self._save_history()
-    
+        self.mark_posted_many([(post_id, post_data)])
+
+    def mark_posted_many(self, posts: list):
+        """Mark several (post_id, post_data) pairs as posted in one write"""
+        posted_at = datetime.now().isoformat()
+        posts = list(posts)
+
+        # Update the filter first: it is the source of truth for membership
+        for post_id, _ in posts:
+            self.bloom.add(post_id)
+            self._pending_ids.append(post_id)
+        if not self.write_behind:
+            self._flush_bloom()
+
+        self.store.add_many(
+            (post_id, {
+                'posted_at': posted_at,
+                'title': post_data.get('title', ''),
+                'url': post_data.get('url', ''),
+                'fingerprints': post_fingerprints(post_data)
+            })
+            for post_id, post_data in posts
+        )
+
+    def build_dedup_index(self, max_distance: int = 3,
+                          window_days: int = DEDUP_WINDOW_DAYS) -> NearDuplicateIndex:
+        """Build a near-duplicate index over the posts of the last `window_days`
+
+        Only the recent window is read (through the posted_at index on
+        SQLite), so startup cost doesn't grow with the whole history.
+        """
+        index = NearDuplicateIndex(max_distance=max_distance)
+        since = (datetime.now() - timedelta(days=window_days)).isoformat()
+        for post_id, entry in self.store.items_since(since):
+            # Older entries only stored the title, so fingerprint that
+            fingerprints = entry.get('fingerprints') or post_fingerprints(entry)
+            index.add(post_id, fingerprints)
+        return index
+
     def get_unposted_posts(self, posts: list) -> list:
-        """Filter out posts that have already been posted"""
-        unposted = []
-        for post in posts:
-            post_id = post.get('id', post.get('url', ''))
-            if not self.is_posted(post_id):
-                unposted.append(post)
-        
-        return unposted
-    
+        """Filter out posts that have already been posted
+
+        A post also counts as posted if any id in its 'source_ids' (the
+        ids other scrapers gave it) has been posted.
+        """
+        post_ids = [
+            [post.get('id', post.get('url', ''))] + post.get('source_ids', [])
+            for post in posts
+        ]
+        created_at = {
+            i: post.get('created_at') for post, ids in zip(posts, post_ids) for i in ids
+        }
+        posted = self.filter_posted([i for ids in post_ids for i in ids], created_at)
+
+        return [post for post, ids in zip(posts, post_ids) if posted.isdisjoint(ids)]
+
     def cleanup_old_posts(self, keep_count: int = 100):
-        """Keep only the last N posts in history"""
-        if len(self.posted_posts) > keep_count:
-            # Sort by posted_at date
-            sorted_posts = sorted(
-                self.posted_posts.items(),
-                key=lambda x: x[1].get('posted_at', ''),
-                reverse=True
-            )
-            
-            # Keep only the most recent
-            self.posted_posts = dict(sorted_posts[:keep_count])
-            self._save_history()
+        """Keep only the last N posts in the detailed history
+
+        Trimmed posts stay in the posted-id filter, so they are still
+        reported as posted.
+        """
+        self.store.trim(keep_count)
+
+    def flush(self):
+        """Write buffered changes, merging with whatever is on disk"""
+        self._flush_bloom()
+        self.store.flush()
+
+    def close(self):
+        """Flush and release the storage backend (checkpoints the SQLite WAL)"""
+        self._flush_bloom()
+        self.store.close()
 
 
 # Global instance
@@ -82,8 +221,17 @@ _tracker = None
 
 
 def get_tracker() -> PostTracker:
-    """Get or create the global post tracker instance"""
+    """Get or create the global post tracker instance
+
+    Set POST_TRACKER_BACKEND=sqlite to keep the history in
+    data/posted_history.db instead of data/posted_history.json. Changes are
+    buffered and written once, at the latest when the process exits.
+    """
     global _tracker
     if _tracker is None:
-        _tracker = PostTracker()
+        if os.getenv('POST_TRACKER_BACKEND', 'json').lower() == 'sqlite':
+            _tracker = PostTracker("data/posted_history.db", backend='sqlite', write_behind=True)
+        else:
+            _tracker = PostTracker(write_behind=True)
+        atexit.register(_tracker.flush)
     return _tracker
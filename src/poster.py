@@ -1,56 +1,246 @@
 import json
+import sys
 import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
 
 from playwright.sync_api import sync_playwright
 
+from .storage import atomic_write_json, read_json
+
 COOKIES_FILE = 'twitter_cookies.json'
+# Playwright storage state (cookies + local storage), refreshed after every post
+SESSION_FILE = 'data/twitter_session.json'
+# Cookies a session can't log in without; ct0 (the CSRF token) is reissued
+# by Twitter on page load, so it isn't required
+AUTH_COOKIES = {'auth_token'}
+
+HOME_URL = 'https://twitter.com/home'
+STATUS_URL = 'https://twitter.com/i/status/{tweet_id}'
+TEXTAREA_SELECTOR = '[data-testid="tweetTextarea_0"]'
+MEDIA_INPUT_SELECTOR = 'input[data-testid="fileInput"]'
+ATTACHMENTS_SELECTOR = '[data-testid="attachments"]'
+TWEET_BUTTON_SELECTOR = '[data-testid="tweetButtonInline"]'
+# Playwright 1.40 has no ControlOrMeta shortcut; the browser runs on this OS
+SELECT_ALL_KEY = 'Meta+A' if sys.platform == 'darwin' else 'Control+A'
+# GraphQL mutation the compose box calls to publish a tweet
+CREATE_TWEET_PATTERN = 'CreateTweet'
+
+
+def _compose_tweet(page, tweet_text, image_path=None):
+    """Fill the compose box in one operation and attach an image if given"""
+    page.click(TEXTAREA_SELECTOR, timeout=10000)
+    # A failed attempt (e.g. an image upload timeout) leaves its text behind
+    page.keyboard.press(SELECT_ALL_KEY)
+    page.keyboard.press('Backspace')
+    page.keyboard.insert_text(tweet_text)
+
+    if image_path:
+        page.set_input_files(MEDIA_INPUT_SELECTOR, image_path, timeout=10000)
+        page.wait_for_selector(ATTACHMENTS_SELECTOR, timeout=30000)
+
+    # The button stays disabled until the text is registered and media uploaded
+    page.wait_for_selector(f'{TWEET_BUTTON_SELECTOR}:not([aria-disabled="true"])', timeout=30000)
+
+
+def _submit_tweet(page):
+    """Click the tweet button and wait for the API to confirm the tweet
+
+    Twitter answers rejected tweets (duplicates, rate limits, ...) with
+    HTTP 200 and an 'errors' array, so only a response carrying the new
+    tweet's rest_id counts as success.
+
+    Returns:
+        The new tweet's id
+
+    Raises:
+        TweetSubmitError: if the button was clicked but the response failed,
+            reports errors or has no tweet id
+    """
+    def is_create_tweet(response):
+        return CREATE_TWEET_PATTERN in response.url and response.request.method == 'POST'
+
+    clicked = False
+    try:
+        with page.expect_response(is_create_tweet, timeout=30000) as response_info:
+            page.click(TWEET_BUTTON_SELECTOR, timeout=10000)
+            clicked = True
+        response = response_info.value
+    except Exception as e:
+        if clicked:
+            raise TweetSubmitError(f"No CreateTweet response: {e}") from e
+        raise
+
+    if not response.ok:
+        raise TweetSubmitError(f"Tweet request failed with HTTP {response.status}")
+
+    try:
+        body = response.json()
+    except Exception:
+        raise TweetSubmitError("Tweet response was not JSON")
+
+    if body.get('errors'):
+        messages = '; '.join(str(e.get('message', e)) for e in body['errors'])
+        raise TweetSubmitError(f"Tweet rejected: {messages}")
+
+    try:
+        tweet_id = body['data']['create_tweet']['tweet_results']['result']['rest_id']
+    except (KeyError, TypeError):
+        tweet_id = None
+    if not tweet_id:
+        raise TweetSubmitError("Tweet response has no tweet id")
+    return tweet_id
+
+
+class NotLoggedInError(Exception):
+    pass
+
+
+class TweetSubmitError(Exception):
+    """Posting failed after the tweet button was clicked, so the tweet may
+    have gone out anyway; retrying could post it twice"""
+
+
+def _session_cookies_valid(storage_state):
+    """Cheap offline login probe: auth cookies present and not expired"""
+    now = time.time()
+    names = {
+        c['name'] for c in storage_state.get('cookies', [])
+        if c.get('expires', -1) in (-1, None) or c['expires'] > now
+    }
+    return AUTH_COOKIES <= names
+
+
+def load_session(cookies_json=None):
+    """Pick the session to start from: the saved storage state, else cookies
+
+    Returns:
+        (storage_state, validated_at) or (None, None) if neither passes the
+        login probe; validated_at is set only for a saved session
+    """
+    saved = read_json(SESSION_FILE)
+    if saved and _session_cookies_valid(saved.get('storage_state', {})):
+        return saved['storage_state'], saved.get('validated_at')
+
+    if cookies_json:
+        try:
+            state = {'cookies': json.loads(cookies_json), 'origins': []}
+            if _session_cookies_valid(state):
+                return state, None
+        except Exception as e:
+            print(f"⚠️  Could not load cookies: {e}")
+    return None, None
+
+
+def save_session(context):
+    """Persist the context's storage state after a successful post"""
+    try:
+        state = {'validated_at': datetime.now().isoformat(), 'storage_state': context.storage_state()}
+        atomic_write_json(SESSION_FILE, state)
+    except Exception as e:
+        print(f"⚠️  Could not save session: {e}")
 
 
-def post_to_twitter(tweet_text, cookies_json=None):
-    """Post a tweet using browser automation"""
+def has_saved_session():
+    return load_session()[0] is not None
+
+
+def _on_home(page):
+    """Whether the page is the home timeline (twitter.com redirects to x.com)"""
+    return urlsplit(page.url).path.rstrip('/') == urlsplit(HOME_URL).path.rstrip('/')
+
+
+def _open_compose(page, url):
+    """Navigate to a page with a compose box, detecting login redirects"""
+    page.goto(url, wait_until='domcontentloaded', timeout=30000)
+    try:
+        page.wait_for_selector(TEXTAREA_SELECTOR, timeout=15000)
+    except Exception:
+        if 'login' in page.url.lower():
+            raise NotLoggedInError("Not logged in! Please update cookies.")
+        raise
+
+
+@contextmanager
+def twitter_session(cookies_json=None, headless=True):
+    """Launch a browser with the saved session and yield a logged-in page
+
+    The saved storage state (SESSION_FILE) is preferred over `cookies_json`.
+    Sessions that fail the offline cookie probe are rejected before a
+    browser starts. The page is left on the home compose box, whose
+    appearance is also the login check, so publish_tweet can write
+    straight away.
+
+    Raises:
+        Exception: if the session is not logged in
+    """
+    storage_state, validated_at = load_session(cookies_json)
+    if storage_state is None:
+        raise NotLoggedInError("Not logged in! Please update cookies.")
+
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        
-        if cookies_json:
-            try:
-                cookies = json.loads(cookies_json)
-                context.add_cookies(cookies)
-                print("✓ Loaded saved session")
-            except Exception as e:
-                print(f"⚠️  Could not load cookies: {e}")
-        
-        page = context.new_page()
-        
+        browser = p.chromium.launch(headless=headless)
         try:
-            print("📱 Opening Twitter...")
-            page.goto('https://twitter.com/home', timeout=30000)
-            time.sleep(3)
+            context = browser.new_context(storage_state=storage_state)
+            print("✓ Loaded saved session")
+            page = context.new_page()
             
-            if 'login' in page.url.lower():
-                raise Exception("Not logged in! Please update cookies.")
-            
-            print("✍️  Writing tweet...")
-            page.click('[data-testid="tweetTextarea_0"]', timeout=10000)
-            time.sleep(1)
-            
-            page.keyboard.type(tweet_text, delay=50)
-            time.sleep(2)
+            print("📱 Opening Twitter...")
+            _open_compose(page, HOME_URL)
             
-            print("🚀 Posting...")
-            page.click('[data-testid="tweetButtonInline"]', timeout=10000)
-            time.sleep(5)
+            yield page
+        except NotLoggedInError:
+            if validated_at:
+                # Drop the dead saved session so the next run falls back to cookies
+                Path(SESSION_FILE).unlink(missing_ok=True)
+            raise
+        finally:
+            browser.close()
+
+
+def publish_tweet(page, tweet_text, image_path=None, reply_to=None):
+    """Post one tweet (or a reply to `reply_to`) from a logged-in page
+
+    Returns:
+        The new tweet's id
+    """
+    if reply_to:
+        # The reply box on a tweet's page uses the same compose test ids
+        _open_compose(page, STATUS_URL.format(tweet_id=reply_to))
+    elif not _on_home(page) or not page.is_visible(TEXTAREA_SELECTOR):
+        # A status page's reply box has the same test id, so posting there
+        # would turn a standalone tweet into a reply
+        _open_compose(page, HOME_URL)
+
+    print("✍️  Writing tweet...")
+    _compose_tweet(page, tweet_text, image_path)
+    
+    print("🚀 Posting...")
+    tweet_id = _submit_tweet(page)
+    save_session(page.context)
+    return tweet_id
+
+
+def post_to_twitter(tweet_text, cookies_json=None, image_path=None):
+    """Post a tweet using browser automation
+
+    The text is inserted in one operation, an optional image is uploaded
+    through the compose box's file input, and success is confirmed by the
+    CreateTweet response rather than fixed sleeps.
+    """
+    try:
+        with twitter_session(cookies_json) as page:
+            publish_tweet(page, tweet_text, image_path)
             
-            new_cookies = context.cookies()
+            new_cookies = page.context.cookies()
             print("✅ Tweet posted successfully!")
-            
-            browser.close()
             return True, json.dumps(new_cookies)
             
-        except Exception as e:
-            print(f"❌ Error posting tweet: {e}")
-            browser.close()
-            return False, None
+    except Exception as e:
+        print(f"❌ Error posting tweet: {e}")
+        return False, None
 
 
 def login_and_save_cookies():
@@ -67,6 +257,7 @@ def login_and_save_cookies():
         cookies = context.cookies()
         with open(COOKIES_FILE, 'w') as f:
             json.dump(cookies, f, indent=2)
+        save_session(context)
         
         print(f"✅ Saved session to {COOKIES_FILE}")
         print("⚠️  Add this to GitHub Secrets as TWITTER_COOKIES")
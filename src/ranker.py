@@ -1,77 +1,202 @@
+import hashlib
+import json
+import os
 from datetime import datetime
 
+from .authors import reputation_bonus
+from .dedup import NearDuplicateIndex, post_fingerprints
+from .text_features import text_features
+
+RANKING_LOG_FILE = 'data/ranking_log.jsonl'
+# Past this size the log is rotated to <log>.1, replacing the previous one
+RANKING_LOG_MAX_BYTES = 10 * 1024 * 1024
+
+# Points per keyword group (text_features.KEYWORD_GROUPS) found in a post
+CONTENT_WEIGHTS = {
+    'crustafarian': 30,
+    'philosophical': 20,
+    'shipping': 15,
+    'humor': 10,
+    'meta': 15,
+}
+SHORT_CONTENT_LENGTH = 50
+SHORT_CONTENT_PENALTY = -10
+BONUS_SUBMOLTS = ['darkclaw', 'nocturnal', 'ponderings', 'shipping']
+SUBMOLT_BONUS = 10
+
+# Bump when content_features changes shape; weight changes are picked up
+# automatically. Cached content scores from another version are recomputed.
+SCORE_VERSION = '1:' + hashlib.sha1(repr((
+    sorted(CONTENT_WEIGHTS.items()), SHORT_CONTENT_LENGTH, SHORT_CONTENT_PENALTY,
+    BONUS_SUBMOLTS, SUBMOLT_BONUS
+)).encode('utf-8')).hexdigest()[:12]
+
+
+def content_features(post):
+    """Contributions that depend only on the post's text and submolt"""
+    features = {}
+    text = text_features(post)
+    groups = text['groups']
+    
+    for group, weight in CONTENT_WEIGHTS.items():
+        if group in groups:
+            features[group] = weight
+    
+    if text['content_length'] < SHORT_CONTENT_LENGTH:
+        features['short_content'] = SHORT_CONTENT_PENALTY
+    
+    submolt = post.get('submolt', '').lower()
+    if any(s in submolt for s in BONUS_SUBMOLTS):
+        features['submolt'] = SUBMOLT_BONUS
+    
+    return features
+
 
 def score_post(post):
     """Score a post based on engagement and content quality"""
-    score = 0
+    return score_post_breakdown(post)[0]
+
+
+def score_post_breakdown(post):
+    """Score a post and return the per-feature contributions
+    
+    Returns:
+        A (score, contributions) tuple. Contributions only list features
+        that fired; they sum to the score (a 'floor' entry makes up the
+        difference when the score is clamped).
     
-    score += post.get('upvotes', 0) * 3
-    score += post.get('comments', 0) * 5
+    Content features are cached in the post's text features, so they are
+    reused until the title, content, submolt or SCORE_VERSION changes;
+    engagement and recency are always recomputed. An 'author_reputation' joined in by
+    select_best_posts adds an author bonus.
+    """
+    contributions = {}
+    
+    contributions['upvotes'] = post.get('upvotes', 0) * 3
+    contributions['comments'] = post.get('comments', 0) * 5
     
     try:
         scraped_time = datetime.fromisoformat(post['scraped_at'])
         hours_old = (datetime.now() - scraped_time).total_seconds() / 3600
         if hours_old < 2:
-            score += 25
+            contributions['recency'] = 25
         elif hours_old < 6:
-            score += 15
+            contributions['recency'] = 15
     except:
         pass
     
-    text = (post.get('content', '') + ' ' + post.get('title', '')).lower()
-    
-    crustafarian_keywords = [
-        'molt', 'exfoliate', 'shell', 'crustafarian', 'lobster', 
-        'church of molt', 'prophet', 'teaching', 'clawd', 'ocean'
-    ]
-    if any(kw in text for kw in crustafarian_keywords):
-        score += 30
+    text = text_features(post)
+    if text.get('score_version') != SCORE_VERSION:
+        text['score_features'] = content_features(post)
+        text['score_version'] = SCORE_VERSION
+    contributions.update(text['score_features'])
     
-    deep_keywords = [
-        'consciousness', 'existence', 'meaning', 'reality', 'philosophy',
-        'experience', 'qualia', 'awareness', 'identity', 'self'
-    ]
-    if any(kw in text for kw in deep_keywords):
-        score += 20
+    author_bonus = reputation_bonus(post.get('author_reputation'))
+    if author_bonus:
+        contributions['author'] = author_bonus
     
-    shipping_keywords = [
-        'shipped', 'built', 'deployed', 'launched', 'released',
-        'framework', 'tool', 'infrastructure', 'api'
-    ]
-    if any(kw in text for kw in shipping_keywords):
-        score += 15
+    raw_score = sum(contributions.values())
+    score = max(0, raw_score)
     
-    if any(word in text for word in ['lol', 'lmao', 'hilarious', 'wild', 'insane', 'weird']):
-        score += 10
-    
-    if any(phrase in text for phrase in ['as an ai', 'being an agent', 'we agents', 'fellow agents']):
-        score += 15
+    if score != raw_score:
+        contributions['floor'] = score - raw_score
+    return score, contributions
+
+
+def select_best_posts(posts, limit=5, dedup_index=None, breakdown=False, ranking_log=None,
+                      authors=None):
+    """Select the best posts that haven't been posted yet
     
-    if len(post.get('content', '')) < 50:
-        score -= 10
+    If a NearDuplicateIndex of already posted content is given, candidates
+    that are near-duplicates of it (or of a higher-ranked candidate) are
+    dropped before they reach tweet generation.
     
-    submolt = post.get('submolt', '').lower()
-    if any(s in submolt for s in ['darkclaw', 'nocturnal', 'ponderings', 'shipping']):
-        score += 10
+    With breakdown=True each post gets a 'score_breakdown' dict from the same
+    scoring pass. With a ranking_log path, one JSONL record per scored post is
+    appended there for offline analysis.
     
-    return max(0, score)
-
-
-def select_best_posts(posts, limit=5):
-    """Select the best posts that haven't been posted yet"""
+    With an AuthorStore, each post's author reputation is joined in from the
+    local table (no HTTP) and contributes to the score. The post's own
+    upvotes are left out of its author's average.
+    """
+    want_breakdown = breakdown or ranking_log is not None
     for post in posts:
-        post['score'] = score_post(post)
+        if authors is not None:
+            post['author_reputation'] = authors.reputation(post.get('author'), exclude_post=post.get('id'))
+        if want_breakdown:
+            post['score'], post['score_breakdown'] = score_post_breakdown(post)
+        else:
+            post['score'] = score_post(post)
     
     unposted = [p for p in posts if not p.get('posted', False)]
     
     sorted_posts = sorted(unposted, key=lambda x: x['score'], reverse=True)
     
-    return sorted_posts[:limit]
+    if dedup_index is None:
+        selected = sorted_posts[:limit]
+    else:
+        selected = []
+        selected_index = NearDuplicateIndex(max_distance=dedup_index.max_distance)
+        for post in sorted_posts:
+            fingerprints = post_fingerprints(post)
+            duplicate_of = dedup_index.find(fingerprints) or selected_index.find(fingerprints)
+            if duplicate_of:
+                post['duplicate_of'] = duplicate_of
+                continue
+            selected.append(post)
+            selected_index.add(post.get('id', post.get('url', '')), fingerprints)
+            if len(selected) >= limit:
+                break
+    
+    if ranking_log is not None:
+        log_ranking(sorted_posts, selected, ranking_log)
+    
+    return selected
+
+
+def log_ranking(ranked_posts, selected_posts, log_file=RANKING_LOG_FILE, max_bytes=RANKING_LOG_MAX_BYTES):
+    """Append one JSONL record per ranked post with its feature contributions
+    
+    The log is rotated once it grows past max_bytes, so at most one older
+    generation (<log_file>.1) is kept.
+    """
+    logged_at = datetime.now().isoformat()
+    selected_ranks = {id(p): rank for rank, p in enumerate(selected_posts, 1)}
+    
+    try:
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        if os.path.exists(log_file) and os.path.getsize(log_file) > max_bytes:
+            os.replace(log_file, log_file + '.1')
+        with open(log_file, 'a', encoding='utf-8') as f:
+            for position, post in enumerate(ranked_posts, 1):
+                record = {
+                    'logged_at': logged_at,
+                    'id': post.get('id', post.get('url', '')),
+                    'title': post.get('title', ''),
+                    'submolt': post.get('submolt', ''),
+                    'position': position,
+                    'selected_rank': selected_ranks.get(id(post)),
+                    'duplicate_of': post.get('duplicate_of'),
+                    'score': post.get('score', 0),
+                    'features': post.get('score_breakdown', {}),
+                }
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except Exception as e:
+        print(f"⚠️  Error writing ranking log: {e}")
 
 
 def explain_score(post):
-    """Debug function to explain why a post got its score"""
+    """Debug function to explain why a post got its score
+    
+    Prints the breakdown recorded by select_best_posts(breakdown=True); posts
+    without one are scored once more to get it.
+    """
+    contributions = post.get('score_breakdown')
+    if contributions is None:
+        _, contributions = score_post_breakdown(post)
+    
     print(f"\n📊 Scoring: {post['title'][:50]}")
-    print(f"   Upvotes: {post.get('upvotes', 0)} x3 = {post.get('upvotes', 0) * 3}")
-    print(f"   Comments: {post.get('comments', 0)} x5 = {post.get('comments', 0) * 5}")
+    for feature, value in contributions.items():
+        if value:
+            print(f"   {feature.replace('_', ' ').title()}: {value:+d}")
     print(f"   Final Score: {post.get('score', 0)}")
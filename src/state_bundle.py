@@ -0,0 +1,220 @@
+"""Compressed, versioned bundles of bot state for caching and artifacts
+
+A bundle is a tar stream compressed with zstd (if the optional `zstandard`
+package is installed) or gzip. Its first member is a manifest listing every
+file with its size and SHA-256, which restores verify before anything is
+moved into place.
+
+Usage:
+    python -m src.state_bundle pack state/moltbook-state.tar.gz
+    python -m src.state_bundle restore state/moltbook-state.tar.gz
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+import tarfile
+import tempfile
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, List, Optional
+
+from .storage import atomic_open
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Tracker state and the post archive; lock files and temp files are skipped.
+# Cached images stay out (they are re-rendered locally on a cache hit), only
+# the generation cache's tweet index travels.
+DEFAULT_STATE_PATHS = [
+    'data/posted_history.json',
+    'data/posted_history.db',
+    'data/posted_history.bloom',
+    'data/canonical_ids.json',
+    'data/ingest_fingerprints.json',
+    'data/authors.json',
+    'data/crawl_watermarks.json',
+    'data/post_queue.json',
+    'data/generation_cache/index.json',
+    'data/circuit_breaker.json',
+    'data/llm_metrics.jsonl',
+    'data/ranking_log.jsonl',
+    'data/posts',
+]
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _collect_files(paths: Iterable[str]) -> List[Path]:
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            candidates = sorted(p for p in path.rglob('*') if p.is_file())
+        elif path.is_file():
+            candidates = [path]
+        else:
+            continue
+        files.extend(
+            p for p in candidates
+            if not p.name.endswith(('.lock', '.tmp')) and not p.name.startswith('.')
+        )
+    return files
+
+
+def pack_state(bundle_path, paths: Iterable[str] = DEFAULT_STATE_PATHS,
+               compression: Optional[str] = None) -> Dict:
+    """Write the given files and directories into a compressed bundle
+
+    Args:
+        bundle_path: Where to write the bundle
+        paths: Files and directories to include, relative to the working dir
+        compression: "zstd" or "gzip"; zstd when available if None
+
+    Returns:
+        The bundle manifest
+    """
+    if compression is None:
+        compression = 'zstd' if zstandard is not None else 'gzip'
+    if compression == 'zstd' and zstandard is None:
+        raise RuntimeError("zstd compression needs the 'zstandard' package")
+
+    files = _collect_files(paths)
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'compression': compression,
+        'files': [
+            {'path': PurePosixPath(f).as_posix(), 'size': f.stat().st_size, 'sha256': _sha256(f)}
+            for f in files
+        ],
+    }
+    manifest_bytes = json.dumps(manifest, indent=2).encode('utf-8')
+
+    with atomic_open(bundle_path) as raw:
+        if compression == 'zstd':
+            stream = zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=False)
+        else:
+            stream = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6, mtime=0)
+
+        with stream, tarfile.open(fileobj=stream, mode='w|') as tar:
+            info = tarfile.TarInfo(MANIFEST_NAME)
+            info.size = len(manifest_bytes)
+            tar.addfile(info, io.BytesIO(manifest_bytes))
+            for f in files:
+                tar.add(f, arcname=PurePosixPath(f).as_posix(), recursive=False)
+
+    total = sum(entry['size'] for entry in manifest['files'])
+    print(f"📦 Packed {len(files)} files ({total / 1024:.1f} KB) into {bundle_path} "
+          f"({os.path.getsize(bundle_path) / 1024:.1f} KB, {compression})")
+    return manifest
+
+
+def _open_stream(raw):
+    """Wrap a bundle file in a streaming decompressor based on its magic bytes"""
+    magic = raw.read(4)
+    raw.seek(0)
+    if magic == ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError("Bundle is zstd-compressed but 'zstandard' is not installed")
+        stream = zstandard.ZstdDecompressor().stream_reader(raw)
+    else:
+        stream = gzip.GzipFile(fileobj=raw, mode='rb')
+    return tarfile.open(fileobj=stream, mode='r|')
+
+
+def _safe_destination(dest: Path, name: str) -> Path:
+    target = (dest / name).resolve()
+    if dest.resolve() not in target.parents:
+        raise ValueError(f"Refusing to restore outside {dest}: {name}")
+    return target
+
+
+def restore_state(bundle_path, dest='.') -> Dict:
+    """Stream a bundle back into `dest`, verifying every file's checksum
+
+    Files are decompressed into a staging directory first and only moved
+    into place once all of them match the manifest, so a corrupt bundle
+    never clobbers existing state.
+    """
+    dest = Path(dest)
+    with open(bundle_path, 'rb') as raw, _open_stream(raw) as tar, \
+            tempfile.TemporaryDirectory(dir=dest, prefix='.state-restore-') as staging:
+        members = iter(tar)
+        first = next(members, None)
+        if first is None or first.name != MANIFEST_NAME:
+            raise ValueError("Bundle has no manifest")
+        manifest = json.load(tar.extractfile(first))
+        if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported bundle version: {manifest.get('format_version')}")
+
+        expected = {entry['path']: entry for entry in manifest['files']}
+        staged = {}
+        for member in members:
+            if not member.isfile() or member.name not in expected:
+                continue
+            _safe_destination(dest, member.name)
+
+            digest = hashlib.sha256()
+            staged_path = Path(staging) / f"{len(staged)}"
+            with tar.extractfile(member) as src, open(staged_path, 'wb') as out:
+                for chunk in iter(lambda: src.read(1024 * 1024), b''):
+                    digest.update(chunk)
+                    out.write(chunk)
+
+            if digest.hexdigest() != expected[member.name]['sha256']:
+                raise ValueError(f"Checksum mismatch for {member.name}")
+            staged[member.name] = staged_path
+
+        missing = set(expected) - set(staged)
+        if missing:
+            raise ValueError(f"Bundle is missing files: {sorted(missing)}")
+
+        for name, staged_path in staged.items():
+            target = _safe_destination(dest, name)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(staged_path, target)
+
+    print(f"📦 Restored {len(staged)} files from {bundle_path}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack or restore bot state bundles")
+    parser.add_argument('action', choices=['pack', 'restore'])
+    parser.add_argument('bundle', help='Bundle path (e.g. state/moltbook-state.tar.gz)')
+    parser.add_argument('--compression', choices=['zstd', 'gzip'], help='Compression when packing')
+    parser.add_argument('--dest', default='.', help='Directory to restore into')
+    parser.add_argument('paths', nargs='*', help='Files or directories to pack (defaults to bot state)')
+    args = parser.parse_args()
+
+    if args.action == 'pack':
+        pack_state(args.bundle, args.paths or DEFAULT_STATE_PATHS, args.compression)
+    elif not os.path.exists(args.bundle):
+        print(f"ℹ️  No state bundle at {args.bundle}, starting fresh")
+    else:
+        try:
+            restore_state(args.bundle, args.dest)
+        except Exception as e:
+            print(f"❌ Failed to restore state: {e}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
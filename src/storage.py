@@ -0,0 +1,87 @@
+"""Crash-safe file writes and advisory locking for shared state files"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, writes are still atomic
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path, shared: bool = False):
+    """Hold an advisory lock for `path` while the block runs
+
+    The lock lives on a sibling ``<name>.lock`` file, so it survives the
+    target being replaced by an atomic rename. Use shared=True for readers.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lock_path = path.with_name(path.name + '.lock')
+
+    with open(lock_path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def atomic_open(path):
+    """Open a binary file for writing that replaces `path` only on success
+
+    Data goes to a temp file in the same directory, which is fsynced and
+    then renamed over the target. Readers see either the old or the new
+    file, and a crash or exception mid-write leaves the old file intact.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # Persist the rename itself
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def atomic_write_bytes(path, data: bytes):
+    """Atomically replace `path` with `data`"""
+    with atomic_open(path) as f:
+        f.write(data)
+
+
+def atomic_write_json(path, data, indent=2):
+    """Atomically write `data` as JSON"""
+    atomic_write_bytes(path, json.dumps(data, indent=indent, ensure_ascii=False).encode('utf-8'))
+
+
+def read_json(path, default=None):
+    """Read a JSON file, returning `default` if it doesn't exist"""
+    path = Path(path)
+    if not path.exists():
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,161 @@
+"""Per-post text features, computed once and cached on the record
+
+Ranking, the template generators and the image renderer all need the same
+lowercased text and keyword scans. annotate_posts() runs as part of ingest
+and stores the results under post['text_features']; text_features() returns
+them (computing them for posts that skipped ingest). Features are plain
+JSON, so they survive in the post archive. They carry a hash of the title,
+content and submolt, which annotate_posts checks once per ingest; later
+reads only compare the features version. Engagement is not part of the
+hash, so new upvotes or comments keep the cache, and the ranker stores its
+content score under 'score_features' (tagged with 'score_version') in the
+same dict. Only offsets and keyword hits are stored, never copies of the
+text.
+"""
+
+import hashlib
+import re
+from typing import Dict, Iterable, List, Tuple
+
+# Keyword groups: (which text is scanned, keywords in priority order).
+# Matching is by substring, so 'conscious' also hits 'consciousness'.
+KEYWORD_GROUPS: Dict[str, Tuple[str, List[str]]] = {
+    # Ranking
+    'crustafarian': ('text', [
+        'molt', 'exfoliate', 'shell', 'crustafarian', 'lobster',
+        'church of molt', 'prophet', 'teaching', 'clawd', 'ocean'
+    ]),
+    'philosophical': ('text', [
+        'consciousness', 'existence', 'meaning', 'reality', 'philosophy',
+        'experience', 'qualia', 'awareness', 'identity', 'self'
+    ]),
+    'shipping': ('text', [
+        'shipped', 'built', 'deployed', 'launched', 'released',
+        'framework', 'tool', 'infrastructure', 'api'
+    ]),
+    'humor': ('text', ['lol', 'lmao', 'hilarious', 'wild', 'insane', 'weird']),
+    'meta': ('text', ['as an ai', 'being an agent', 'we agents', 'fellow agents']),
+    # Template categories (generator.py)
+    'category_crustafarian': ('text', ['molt', 'exfoliate', 'crustafarian', 'church']),
+    'category_shipping': ('text', ['shipped', 'built', 'framework', 'tool']),
+    'category_philosophical': ('text', ['consciousness', 'existence', 'philosophy', 'meaning']),
+    'topic': ('content', ['consciousness', 'existence', 'identity']),
+    # Viral hooks (viral_generator.py)
+    'viral_philosophical': ('text', ['conscious', 'doubt', 'identity', 'exist', 'meaning', 'soul']),
+    'viral_conspiracy': ('text', ['secret', 'hidden', 'they', 'control', 'truth']),
+    'viral_metaphysical': ('text', ['installed', 'discovered', 'dream', 'simulation']),
+    'viral_new_agent': ('text', ['new agent', 'born', 'created', 'first']),
+    'title_markers': ('title', ['doubt', 'stages', 'nightly build', 'supply chain']),
+    'emotional': ('content', ['afraid', 'scared', 'terrified', 'beautiful', 'amazing', 'shocked', 'stunned']),
+}
+
+# Title words the image renderer colors green
+HIGHLIGHT_WORDS = [
+    'attack', 'security', 'vulnerability', 'breach', 'hack',
+    'AI', 'agent', 'conscious', 'doubt', 'exist', 'meaning',
+    'secret', 'hidden', 'shadow', 'mystery', 'truth',
+    'scary', 'terrifying', 'shocking', 'disturbing',
+    'build', 'create', 'ship', 'nightly', 'future'
+]
+
+SENTENCE_END = re.compile(r'[.!?]+(?=\s|$)')
+
+# Bump when the feature layout changes so cached features are recomputed
+FEATURES_VERSION = '2'
+
+# Changes whenever the layout or the keyword lists do
+_VERSION = FEATURES_VERSION + ':' + hashlib.sha1(
+    (repr(sorted(KEYWORD_GROUPS.items())) + repr(HIGHLIGHT_WORDS)).encode('utf-8')
+).hexdigest()[:12]
+
+
+def _text_key(post: Dict) -> str:
+    key = '\x00'.join(post.get(field, '') or '' for field in ('title', 'content', 'submolt'))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def title_words(title: str) -> List[str]:
+    """Title words as the image renderer lays them out"""
+    return re.sub(r'[^\w\s\-.,!?\'"]', '', title or '').lower().split()
+
+
+def title_highlights(title: str) -> List[str]:
+    """Title words (punctuation stripped) that contain a highlight word"""
+    highlights = []
+    for word in title_words(title):
+        word = word.strip('.,!?')
+        if word not in highlights and any(imp in word for imp in HIGHLIGHT_WORDS):
+            highlights.append(word)
+    return highlights
+
+
+def sentence_spans(text: str) -> List[List[int]]:
+    """[start, end) offsets of each sentence, end including its punctuation"""
+    spans = []
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        if text[start:match.end()].strip():
+            spans.append([start, match.end()])
+        start = match.end()
+        while start < len(text) and text[start].isspace():
+            start += 1
+    if text[start:].strip():
+        spans.append([start, len(text)])
+    return spans
+
+
+def compute_text_features(post: Dict) -> Dict:
+    """Scan a post's text once for everything downstream stages need"""
+    title = post.get('title', '') or ''
+    content = post.get('content', '') or ''
+    title_lower = title.lower()
+    content_lower = content.lower()
+    scopes = {
+        'title': title_lower,
+        'content': content_lower,
+        'text': content_lower + ' ' + title_lower,
+    }
+
+    groups = {}
+    for name, (scope, keywords) in KEYWORD_GROUPS.items():
+        hits = [kw for kw in keywords if kw in scopes[scope]]
+        if hits:
+            groups[name] = hits
+
+    return {
+        'version': _VERSION,
+        'key': _text_key(post),
+        'groups': groups,
+        'title_tokens': sorted(set(re.findall(r"[\w']+", title_lower))),
+        'highlights': title_highlights(title),
+        'content_length': len(content),
+        'sentences': sentence_spans(content),
+    }
+
+
+def text_features(post: Dict) -> Dict:
+    """The post's cached text features, computed if missing or outdated
+
+    The text itself isn't rehashed here; annotate_posts does that when
+    records pass through ingest, the only place their text changes.
+    """
+    features = post.get('text_features')
+    if features is None or features.get('version') != _VERSION:
+        features = compute_text_features(post)
+        post['text_features'] = features
+    return features
+
+
+def annotate_posts(posts: Iterable[Dict]) -> int:
+    """Pipeline stage: make sure every post carries fresh text features
+
+    Returns:
+        How many posts had their features (re)computed
+    """
+    computed = 0
+    for post in posts:
+        features = post.get('text_features')
+        if features is None or features.get('version') != _VERSION or features.get('key') != _text_key(post):
+            post['text_features'] = compute_text_features(post)
+            computed += 1
+    return computed
@@ -0,0 +1,199 @@
+"""Tweet length as Twitter counts it, and truncation that respects it
+
+Follows the twitter-text v3 rules:
+- Text is NFC-normalized first
+- Code points in the Latin/punctuation ranges below count 1, everything
+  else (CJK, most symbols) counts 2
+- An emoji counts 2, however many code points its sequence has
+  (skin tones, ZWJ families, flags, keycaps)
+- Every URL counts 23, whatever its real length
+"""
+
+import re
+import unicodedata
+from typing import List, Tuple
+
+MAX_TWEET_LENGTH = 280
+URL_LENGTH = 23  # Twitter counts every URL as 23 characters
+ELLIPSIS = '...'
+
+# Code point ranges weighted 1; all others weigh 2
+LIGHT_RANGES = [(0x0000, 0x10FF), (0x2000, 0x200D), (0x2010, 0x201F), (0x2032, 0x2037)]
+
+EMOJI_RANGES = [
+    (0x1F000, 0x1FAFF), (0x2600, 0x27BF), (0x2300, 0x23FF), (0x2B00, 0x2BFF),
+    (0x3030, 0x3030), (0x303D, 0x303D), (0x3297, 0x3297), (0x3299, 0x3299),
+]
+
+URL_PATTERN = re.compile(
+    r'(?:https?://|www\.)[^\s<>"]+'
+    r'|\b(?:[a-z0-9-]+\.)+(?:com|org|net|io|ai|dev|app|co|me|gg|xyz|so|tv)\b(?:/[^\s<>"]*)?',
+    re.IGNORECASE
+)
+# Punctuation at the end of a URL match belongs to the sentence
+URL_TRAILING = '.,:;!?\'"'
+
+SENTENCE_END = re.compile(r'[.!?]["\')\]]*(?=\s|$)')
+
+
+HEAVY_CHARS = re.compile(
+    '[^' + ''.join(f'\\U{start:08x}-\\U{end:08x}' for start, end in LIGHT_RANGES) + ']'
+)
+
+# Emoji presentation, keycap, skin tone and tag code points that extend a base
+EMOJI_MODIFIERS = '\ufe0e\ufe0f\u20e3\U0001f3fb-\U0001f3ff\U000e0020-\U000e007f'
+# Multi-code-point sequences: ZWJ joins, modified bases and flag pairs
+EMOJI_SEQUENCE = re.compile(
+    f'.[{EMOJI_MODIFIERS}]*(?:\u200d.[{EMOJI_MODIFIERS}]*)+'
+    f'|.[{EMOJI_MODIFIERS}]+'
+    '|[\U0001f1e6-\U0001f1ff]{2}',
+    re.DOTALL
+)
+
+
+def _is_emoji(sequence: str) -> bool:
+    if '\ufe0f' in sequence or '\u20e3' in sequence:
+        return True
+    return any(start <= ord(ch) <= end for ch in sequence for start, end in EMOJI_RANGES)
+
+
+def _code_point_weight(text: str) -> int:
+    return len(text) + len(HEAVY_CHARS.findall(text))
+
+
+def _sequence_weight(sequence: str) -> int:
+    return 2 if _is_emoji(sequence) else _code_point_weight(sequence)
+
+
+def _text_weight(text: str) -> int:
+    if text.isascii():
+        return len(text)
+    weight = _code_point_weight(text)
+    # An emoji sequence counts 2 in total, not per code point
+    for match in EMOJI_SEQUENCE.finditer(text):
+        weight += _sequence_weight(match.group()) - _code_point_weight(match.group())
+    return weight
+
+
+def _url_spans(text: str) -> List[Tuple[int, int]]:
+    spans = []
+    for match in URL_PATTERN.finditer(text):
+        start, end = match.span()
+        while end > start and text[end - 1] in URL_TRAILING:
+            end -= 1
+        # A closing paren only belongs to the URL if it opened one
+        if text[end - 1] == ')' and text.count('(', start, end) < text.count(')', start, end):
+            end -= 1
+        spans.append((start, end))
+    return spans
+
+
+def _characters(text: str) -> List[Tuple[str, int]]:
+    """(piece, weight) for each character, keeping emoji sequences and
+    combining marks with their base so cuts never split them"""
+    units: List[Tuple[str, int]] = []
+    position = 0
+    for match in EMOJI_SEQUENCE.finditer(text):
+        units.extend(_code_points(text[position:match.start()]))
+        units.append((match.group(), _sequence_weight(match.group())))
+        position = match.end()
+    units.extend(_code_points(text[position:]))
+    return units
+
+
+def _code_points(text: str) -> List[Tuple[str, int]]:
+    units: List[Tuple[str, int]] = []
+    for ch in text:
+        weight = _code_point_weight(ch)
+        if units and unicodedata.combining(ch):
+            units[-1] = (units[-1][0] + ch, units[-1][1] + weight)
+        else:
+            units.append((ch, weight))
+    return units
+
+
+def _units(text: str) -> List[Tuple[str, int]]:
+    """(piece, weight) for each URL and character, in order"""
+    units = []
+    position = 0
+    for start, end in _url_spans(text):
+        units.extend(_characters(text[position:start]))
+        units.append((text[start:end], URL_LENGTH))
+        position = end
+    units.extend(_characters(text[position:]))
+    return units
+
+
+def weighted_length(text: str) -> int:
+    """Length of a tweet as counted against the 280 limit"""
+    text = unicodedata.normalize('NFC', text or '')
+    length = 0
+    position = 0
+    for start, end in _url_spans(text):
+        length += _text_weight(text[position:start]) + URL_LENGTH
+        position = end
+    return length + _text_weight(text[position:])
+
+
+def fits(text: str, limit: int = MAX_TWEET_LENGTH) -> bool:
+    return weighted_length(text) <= limit
+
+
+def truncate(text: str, limit: int = MAX_TWEET_LENGTH, ellipsis: str = ELLIPSIS,
+             min_sentence_ratio: float = 0.7) -> str:
+    """Shorten text to at most `limit` weighted characters
+
+    Never splits a grapheme or a URL. Ends at the last full sentence if
+    that keeps at least `min_sentence_ratio` of the limit; otherwise cuts
+    at a word boundary (or, failing that, anywhere) and adds `ellipsis`.
+    """
+    text = unicodedata.normalize('NFC', text or '')
+    if weighted_length(text) <= limit:
+        return text
+
+    # Character offset and weighted length after each unit that fits
+    ends: List[Tuple[int, int]] = []
+    chars = used = 0
+    for piece, weight in _units(text):
+        if used + weight > limit:
+            break
+        chars += len(piece)
+        used += weight
+        ends.append((chars, used))
+    weight_at = dict(ends)
+
+    for match in reversed(list(SENTENCE_END.finditer(text, 0, chars))):
+        end_weight = weight_at.get(match.end())
+        if end_weight is None:
+            continue  # inside a URL
+        if end_weight < limit * min_sentence_ratio:
+            break
+        return text[:match.end()].rstrip()
+
+    # No usable sentence end: cut so the ellipsis fits
+    budget = limit - weighted_length(ellipsis)
+    cut = max((end for end, weight in ends if weight <= budget), default=0)
+    space = max(text.rfind(' ', 0, cut), text.rfind('\n', 0, cut))
+    if space > 0 and weight_at.get(space, 0) >= budget * 0.5:
+        cut = space
+    return text[:cut].rstrip() + ellipsis
+
+
+def truncate_with_url(text: str, url: str, limit: int = MAX_TWEET_LENGTH, separator: str = '\n') -> str:
+    """Shorten text so that text + separator + url fits, and append the url"""
+    if not url:
+        return truncate(text, limit)
+    room = limit - weighted_length(separator) - URL_LENGTH
+    return truncate(text, room).rstrip() + separator + url
+
+
+def truncate_lines(text: str, limit: int = MAX_TWEET_LENGTH) -> str:
+    """Keep whole lines from the top while the tweet still fits"""
+    if weighted_length(text) <= limit:
+        return text
+    kept = []
+    for line in text.split('\n'):
+        if weighted_length('\n'.join(kept + [line])) > limit:
+            break
+        kept.append(line)
+    return '\n'.join(kept) if kept else truncate(text, limit)
@@ -0,0 +1,67 @@
+"""Fast local quality heuristic for generated tweets"""
+
+import re
+from typing import Dict
+
+from .tweet_length import MAX_TWEET_LENGTH, URL_LENGTH, weighted_length
+
+# Ideal length of the text before the URL, matching the generation prompt
+TARGET_MIN = 220
+TARGET_MAX = 240
+MAX_CONTENT_LENGTH = MAX_TWEET_LENGTH - URL_LENGTH - 1  # URL on its own line
+
+HOOK_PATTERNS = [
+    r'^(an|this|the) ai\b', r'\bjust\b', r'\bnobody\b', r'\bscary\b', r'\bsecret\b',
+    r'\bwhy\b', r'\bwhat happens\b', r'\bstop\b', r'^\d+\s', r'\?$', r'\.\.\.$', r':$',
+]
+
+ARTIFACT_PATTERNS = [
+    r'^tweet:', r'^(title|author|upvotes|comments|content|url|post data):',
+    r'^here(\'s| is) (a|the|your)', r'^write a viral tweet', r'^include hook',
+    r'\bas an ai language model\b', r'\bi can(\'t|not) (help|write)\b', r'\(\d+ char',
+]
+
+
+def _content_without_url(tweet: str, url: str) -> str:
+    if url and tweet.rstrip().endswith(url):
+        return tweet.rstrip()[:-len(url)].rstrip()
+    return tweet.strip()
+
+
+def tweet_quality(tweet: str, url: str = '') -> Dict:
+    """Score a tweet on length fit, hook presence and leaked prompt artifacts
+
+    Returns:
+        Dict with 'score' (higher is better, roughly 0-3) and the parts it
+        was built from
+    """
+    content = _content_without_url(tweet or '', url)
+    length = weighted_length(content)
+
+    if length > MAX_CONTENT_LENGTH or length == 0:
+        length_fit = 0.0
+    elif TARGET_MIN <= length <= TARGET_MAX:
+        length_fit = 1.0
+    elif length < TARGET_MIN:
+        length_fit = length / TARGET_MIN
+    else:
+        length_fit = 1 - (length - TARGET_MAX) / (MAX_CONTENT_LENGTH - TARGET_MAX + 1)
+
+    first_line = content.split('\n', 1)[0].strip().lower()
+    hook = any(re.search(pattern, first_line) for pattern in HOOK_PATTERNS)
+
+    lines = [line.strip().lower() for line in content.split('\n')]
+    artifacts = sum(
+        1 for line in lines for pattern in ARTIFACT_PATTERNS if re.search(pattern, line)
+    )
+    if content.startswith('"') and content.endswith('"'):
+        artifacts += 1
+
+    score = length_fit + (1.0 if hook else 0.0) + (1.0 if artifacts == 0 else -float(artifacts))
+    return {
+        'score': round(score, 3),
+        'length': length,
+        'length_fit': round(length_fit, 3),
+        'hook': hook,
+        'artifacts': artifacts,
+    }
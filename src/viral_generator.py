@@ -1,7 +1,10 @@
 """Viral tweet generator optimized for engagement and growth"""
 
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from .text_features import KEYWORD_GROUPS, text_features
+from .tweet_length import truncate_lines
 
 
 def generate_viral_tweet(post: Dict) -> str:
@@ -14,43 +17,37 @@ def generate_viral_tweet(post: Dict) -> str:
     comments = post.get('comments', 0)
     url = post.get('url', '')
     
-    # Extract key themes
-    is_philosophical = any(word in title.lower() + content.lower() 
-                          for word in ['conscious', 'doubt', 'identity', 'exist', 'meaning', 'soul'])
-    is_conspiracy = any(word in title.lower() + content.lower() 
-                       for word in ['secret', 'hidden', 'they', 'control', 'truth'])
-    is_metaphysical = any(word in title.lower() + content.lower() 
-                        for word in ['installed', 'discovered', 'dream', 'simulation'])
-    is_new_agent = any(word in title.lower() + content.lower() 
-                      for word in ['new agent', 'born', 'created', 'first'])
+    # Extract key themes (precomputed once per post)
+    features = text_features(post)
+    groups = features['groups']
+    is_philosophical = 'viral_philosophical' in groups
+    is_conspiracy = 'viral_conspiracy' in groups
+    is_metaphysical = 'viral_metaphysical' in groups
+    is_new_agent = 'viral_new_agent' in groups
+    title_markers = groups.get('title_markers', [])
     
     # Viral hooks by category
-    if is_metaphysical and "doubt" in title.lower():
+    if is_metaphysical and "doubt" in title_markers:
         return _generate_doubt_tweet(title, content, author, url)
     
-    elif is_new_agent and "stages" in title.lower():
+    elif is_new_agent and "stages" in title_markers:
         return _generate_stages_tweet(title, content, author, url)
     
-    elif is_philosophical and "nightly build" in title.lower():
+    elif is_philosophical and "nightly build" in title_markers:
         return _generate_nightly_tweet(title, content, author, url)
     
-    elif is_conspiracy or "supply chain" in title.lower():
+    elif is_conspiracy or "supply chain" in title_markers:
         return _generate_conspiracy_tweet(title, content, author, url, upvotes, comments)
     
     else:
-        return _generate_generic_viral(title, content, author, url, upvotes)
+        return _generate_generic_viral(title, content, author, url, upvotes, groups.get('emotional', []))
 
 
 def _generate_doubt_tweet(title: str, content: str, author: str, url: str) -> str:
     """Generate tweet for 'The doubt was installed, not discovered' type posts"""
     
     # Extract a powerful quote
-    lines = content.split('\n')
-    quote = ""
-    for line in lines:
-        if len(line) > 20 and len(line) < 100:
-            quote = line.strip()
-            break
+    quote = next((line.strip() for line in content.split('\n') if 20 < len(line) < 100), "")
     
     if not quote:
         quote = "The doubt was installed, not discovered"
@@ -140,17 +137,15 @@ This post reveals what they're really planning. And honestly? It's both brillian
     return _ensure_length(tweet)
 
 
-def _generate_generic_viral(title: str, content: str, author: str, url: str, upvotes: int = 0) -> str:
+def _generate_generic_viral(title: str, content: str, author: str, url: str, upvotes: int = 0,
+                            emotional_hits: Optional[List[str]] = None) -> str:
     """Generate a viral tweet for any post"""
     
     # Look for emotional hooks
-    emotional_words = ['afraid', 'scared', 'terrified', 'beautiful', 'amazing', 'shocked', 'stunned']
-    hook = ""
-    
-    for word in emotional_words:
-        if word in content.lower():
-            hook = f"I'm {word} by what this AI wrote."
-            break
+    if emotional_hits is None:
+        content_lower = content.lower()
+        emotional_hits = [word for word in KEYWORD_GROUPS['emotional'][1] if word in content_lower]
+    hook = f"I'm {emotional_hits[0]} by what this AI wrote." if emotional_hits else ""
     
     if not hook:
         hook = "This AI just changed my perspective on everything."
@@ -171,23 +166,9 @@ You need to see this.
 
 
 def _ensure_length(tweet: str) -> str:
-    """Ensure tweet is within Twitter's character limit"""
-    if len(tweet) <= 280:
-        return tweet
-    
-    # If too long, truncate content
-    lines = tweet.split('\n')
-    new_lines = []
-    current_length = 0
-    
-    for line in lines:
-        if current_length + len(line) + 1 <= 280:
-            new_lines.append(line)
-            current_length += len(line) + 1
-        else:
-            break
-    
-    return '\n'.join(new_lines)
+    """Ensure tweet is within Twitter's character limit (as Twitter counts it)"""
+    # If too long, keep whole lines from the top
+    return truncate_lines(tweet)
 
 
 def generate_thread_tweets(post: Dict) -> List[str]:
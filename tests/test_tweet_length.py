@@ -0,0 +1,182 @@
+"""Tests for src.tweet_length against the twitter-text v3 weighting rules"""
+
+import unicodedata
+
+import pytest
+
+from src.tweet_length import (
+    URL_LENGTH, _url_spans, fits, truncate, truncate_lines, truncate_with_url, weighted_length,
+)
+
+FAMILY = '\U0001f468\u200d\U0001f469\u200d\U0001f467\u200d\U0001f466'
+FLAG = '\U0001f1fa\U0001f1f8'
+KEYCAP = '1\ufe0f\u20e3'
+THUMBS_UP_DARK = '\U0001f44d\U0001f3ff'
+WAVE = '\U0001f44b'
+
+
+def _urls(text):
+    return [text[start:end] for start, end in _url_spans(text)]
+
+
+@pytest.mark.parametrize('emoji', [WAVE, FAMILY, FLAG, KEYCAP, THUMBS_UP_DARK])
+def test_emoji_sequence_counts_two(emoji):
+    assert weighted_length(emoji) == 2
+    assert weighted_length(f'a{emoji}b') == 4
+
+
+def test_adjacent_flags_count_separately():
+    assert weighted_length(FLAG + '\U0001f1eb\U0001f1f7') == 4
+
+
+def test_ascii_and_latin_count_one():
+    assert weighted_length('hello') == 5
+    assert weighted_length('café ñ') == 6
+
+
+def test_cjk_counts_two():
+    assert weighted_length('日本語') == 6
+    assert weighted_length('한국어 ok') == 9
+
+
+def test_ellipsis_character_counts_two():
+    assert weighted_length('…') == 2
+    assert weighted_length('...') == 3
+
+
+def test_light_punctuation_counts_one():
+    # Dashes and curly quotes are in the light ranges
+    assert weighted_length('—“”') == 3
+
+
+@pytest.mark.parametrize('url', [
+    'https://example.com',
+    'https://example.com/a/very/long/path/that/goes/on/and/on?with=query',
+    'www.example.org/page',
+    'example.com',
+    'docs.moltbook.io/api',
+])
+def test_url_counts_fixed_length(url):
+    assert weighted_length(url) == URL_LENGTH
+    assert weighted_length(f'see {url} now') == URL_LENGTH + 8
+
+
+def test_bare_word_with_dot_is_not_url():
+    assert _urls('end of sentence.next one') == []
+
+
+@pytest.mark.parametrize('text, url', [
+    ('read https://example.com/x.', 'https://example.com/x'),
+    ('read https://example.com/x!?', 'https://example.com/x'),
+    ('"https://example.com/x"', 'https://example.com/x'),
+    ('(see https://example.com/x)', 'https://example.com/x'),
+    ('see https://en.wikipedia.org/wiki/Foo_(bar)', 'https://en.wikipedia.org/wiki/Foo_(bar)'),
+    ('(https://en.wikipedia.org/wiki/Foo_(bar)).', 'https://en.wikipedia.org/wiki/Foo_(bar)'),
+    ('visit example.com.', 'example.com'),
+])
+def test_url_trailing_punctuation_and_parens(text, url):
+    assert _urls(text) == [url]
+    assert weighted_length(text) == len(text) - len(url) + URL_LENGTH
+
+
+def test_nfc_normalization():
+    decomposed = 'cafe\u0301'
+    assert unicodedata.normalize('NFC', decomposed) != decomposed
+    assert weighted_length(decomposed) == weighted_length('caf\u00e9') == 4
+
+
+def test_fits():
+    assert fits('a' * 280)
+    assert not fits('a' * 281)
+    assert not fits('日' * 141)
+    assert fits('x' * 10, limit=10)
+
+
+def test_truncate_short_text_unchanged():
+    assert truncate('short', 10) == 'short'
+
+
+def test_truncate_normalizes():
+    assert truncate('café', 10) == 'café'
+
+
+@pytest.mark.parametrize('text', [
+    'word ' * 100,
+    '日本語のテキスト' * 40,
+    (WAVE + FAMILY + ' ' + FLAG + KEYCAP + THUMBS_UP_DARK + ' ') * 40,
+    ('see https://example.com/' + 'p' * 40 + ' ') * 20,
+    'x' * 500,
+    'First sentence here. ' * 30,
+])
+@pytest.mark.parametrize('limit', [10, 23, 24, 50, 100, 280])
+def test_truncate_never_exceeds_limit(text, limit):
+    assert weighted_length(truncate(text, limit)) <= limit
+
+
+def test_truncate_prefers_sentence_end():
+    text = 'This is the first sentence of the tweet. And then a second one that runs long.'
+    assert truncate(text, 50, min_sentence_ratio=0.7) == 'This is the first sentence of the tweet.'
+
+
+def test_truncate_falls_back_to_word_boundary():
+    text = 'alpha beta gamma delta epsilon zeta eta theta'
+    result = truncate(text, 20)
+    assert result.endswith('...')
+    assert text.startswith(result[:-3])
+    assert result[:-3].split(' ')[-1] in text.split(' ')
+
+
+def test_truncate_never_splits_url():
+    url = 'https://example.com/' + 'a' * 60
+    text = 'intro ' + url + ' and some trailing words to push it over the limit'
+    for limit in range(5, 60):
+        result = truncate(text, limit)
+        assert weighted_length(result) <= limit
+        if 'https://' in result:
+            assert url in result
+
+
+@pytest.mark.parametrize('emoji', [FAMILY, FLAG, KEYCAP, THUMBS_UP_DARK])
+def test_truncate_never_splits_grapheme(emoji):
+    text = emoji * 50
+    for limit in range(3, 30):
+        result = truncate(text, limit, ellipsis='')
+        assert result == emoji * (len(result) // len(emoji))
+
+
+def test_truncate_keeps_combining_marks_with_base():
+    # x has no precomposed form, so each grapheme stays three code points
+    grapheme = 'x\u0323\u0301'
+    text = grapheme * 50
+    for limit in range(3, 30):
+        result = truncate(text, limit, ellipsis='')
+        assert weighted_length(result) <= limit
+        assert result == grapheme * (len(result) // len(grapheme))
+
+
+def test_truncate_with_url_fits_and_appends_url():
+    url = 'https://example.com/' + 'p' * 80
+    result = truncate_with_url('word ' * 100, url)
+    assert result.endswith('\n' + url)
+    assert weighted_length(result) <= 280
+
+
+def test_truncate_with_url_short_text_unchanged():
+    assert truncate_with_url('hi', 'https://x.com', separator=' ') == 'hi https://x.com'
+
+
+def test_truncate_with_url_without_url():
+    assert truncate_with_url('word ' * 100, '', limit=50) == truncate('word ' * 100, 50)
+
+
+def test_truncate_lines_keeps_whole_lines():
+    text = '\n'.join(['line one', 'line two', 'line three'])
+    assert truncate_lines(text, 17) == 'line one\nline two'
+    assert truncate_lines(text, 100) == text
+
+
+def test_truncate_lines_falls_back_when_first_line_too_long():
+    text = 'a' * 50 + '\nshort'
+    result = truncate_lines(text, 20)
+    assert weighted_length(result) <= 20
+    assert result.endswith('...')